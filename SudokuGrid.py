@@ -1,67 +1,541 @@
 from PyQt5 import QtCore, QtGui, QtWidgets
+import math
 import random
 
+from sudoku import core
+
+DEFAULT_SOLVE_TIMEOUT = 30  # Seconds before a runaway search is abandoned
+DEFAULT_CACHE_SIZE = 1000  # Symmetry classes of solved puzzles remembered by the window
+BOARD_SIZES = (9, 16, 25)  # Rows per board the window can show
+FRAME_INTERVAL = 16  # Milliseconds between animation frames (about 60 per second)
+
+
+def symbol(value):
+    # The text shown in a cell: 1-9, then letters for larger digits, blank for 0
+    return core.SYMBOLS[value - 1] if value else ""
+
+
+class SolveThread(QtCore.QThread):
+    """
+    Runs the solver on a copy of the grid so the GUI thread stays responsive.
+
+    Exactly one of the signals is emitted when the search ends:
+    - solved(grid, stats): the solved 2D list and the SolveStats of the search (None if the answer came
+      from the cache).
+    - unsolvable(): the puzzle has no solution.
+    - ambiguous(): the puzzle has more than one solution.
+    - cancelled(timed_out): the search was stopped, either by cancel() or by running out of time.
+    """
+    solved = QtCore.pyqtSignal(object, object)
+    unsolvable = QtCore.pyqtSignal()
+    ambiguous = QtCore.pyqtSignal()
+    cancelled = QtCore.pyqtSignal(bool)
+
+    def __init__(self, grid, timeout=None, cache=None, candidates=None, parent=None):
+        super().__init__(parent)
+        self.grid = [row[:] for row in grid]
+        self.token = core.CancelToken(timeout)
+        self.stats = core.SolveStats()
+        self.cache = cache
+        self.candidates = candidates  # Starting candidate masks, e.g. from the window's ConflictIndex
+
+    def run(self):
+        # Only uniquely solvable puzzles are cached, so a hit needs no further checks
+        if self.cache is not None:
+            solution = self.cache.lookup(self.grid)
+            if solution is not None:
+                self.solved.emit(solution, None)
+                return
+
+        puzzle = [row[:] for row in self.grid]
+        try:
+            # Only a puzzle with exactly one solution has an answer worth showing; the same search
+            # fills it in, so the whole time budget goes to a single pass
+            found = core.count_solutions(
+                self.grid, limit=2, token=self.token, stats=self.stats, candidates=self.candidates, fill=True
+            )
+        except core.SolveTimeout:
+            self.cancelled.emit(True)
+            return
+        except core.SolveCancelled:
+            self.cancelled.emit(False)
+            return
+
+        if found == 1:
+            if self.cache is not None:
+                self.cache.store(puzzle, self.grid)
+            self.solved.emit(self.grid, self.stats)
+        elif found == 0:
+            self.unsolvable.emit()
+        else:
+            self.ambiguous.emit()
+
+    def cancel(self):
+        # Called from the GUI thread; the search stops at its next token check
+        self.token.cancel()
+
+
+class BoardWidget(QtWidgets.QWidget):
+    """
+    The whole board as one widget that paints its cells itself.
+
+    Each cell's value, background colour and font size live in flat, row-major lists. Changing them
+    only marks that cell's rectangle dirty, so Qt coalesces the changes and repaints just those
+    cells in a single QPainter pass. Click a cell or move with the arrow keys, then type a symbol to
+    fill it or Backspace, Delete, Space or 0 to empty it. Cells flagged with set_conflict() are drawn
+    in red, and when `candidates` is set, hovering over an empty cell shows its candidates.
+
+    Signals:
+    - edited(row, col, value): the user changed a cell from the keyboard (value 0 when emptied).
+    """
+    edited = QtCore.pyqtSignal(int, int, int)
+
+    BACKGROUND = "white"
+    SELECTED_BACKGROUND = "#dcebfa"
+    CONFLICT_BACKGROUND = "#fde0dc"
+    CONFLICT_TEXT = "#c62828"
+
+    def __init__(self, size=9, cell_pixels=40, font_size=12, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.box = math.isqrt(size)
+        self.cell_pixels = cell_pixels
+        self.font_size = font_size
+        self.values = [0] * (size * size)
+        self.backgrounds = [None] * (size * size)  # None for the default background
+        self.font_sizes = [font_size] * (size * size)
+        self.conflicts = [False] * (size * size)
+        self.selected = 0
+        self.candidates = None  # Optional callable: cell index -> candidate mask, for tooltips
+        self.editable = True
+        self.symbols = core.SYMBOLS[:size]
+
+        # QFont and QColor objects are built once and reused by every paint
+        self.fonts = {}
+        self.colors = {}
+
+        self.setFixedSize(size * cell_pixels + 1, size * cell_pixels + 1)
+        self.setFocusPolicy(QtCore.Qt.StrongFocus)
+
+    def cell_rect(self, index):
+        cell = self.cell_pixels
+        return QtCore.QRect((index % self.size) * cell, (index // self.size) * cell, cell, cell)
+
+    def invalidate(self, index):
+        # Include the borders, which are drawn over the cell edges
+        self.update(self.cell_rect(index).adjusted(-1, -1, 1, 1))
+
+    def value(self, row, col):
+        return self.values[row * self.size + col]
+
+    def set_value(self, row, col, value):
+        index = row * self.size + col
+        if self.values[index] != value:
+            self.values[index] = value
+            self.invalidate(index)
+
+    def grid(self):
+        """
+        Returns the board as a new list of row lists, 0 for empty.
+        """
+        size = self.size
+        return [self.values[row * size:row * size + size] for row in range(size)]
+
+    def set_grid(self, grid_values):
+        """
+        Shows a list of row lists; only the cells whose value changes are repainted.
+        """
+        for row in range(self.size):
+            for col in range(self.size):
+                self.set_value(row, col, grid_values[row][col])
+
+    def text(self):
+        """
+        Returns the board in the text format, using `0` for empty cells.
+        """
+        return "".join(symbol(value) or "0" for value in self.values)
+
+    def clear(self):
+        for index in range(len(self.values)):
+            if self.values[index] or self.backgrounds[index] is not None or self.font_sizes[index] != self.font_size:
+                self.values[index] = 0
+                self.backgrounds[index] = None
+                self.font_sizes[index] = self.font_size
+                self.invalidate(index)
+
+    def set_cell_style(self, cells, background=None, font_size=None):
+        """
+        Changes how some cells are drawn, without touching their values.
+
+        Args:
+        - cells: (row, col) pairs.
+        - background: A colour name, or None for the default background.
+        - font_size: A point size, or None for the board's normal font size.
+        """
+        font_size = font_size or self.font_size
+        for row, col in cells:
+            index = row * self.size + col
+            if self.backgrounds[index] != background or self.font_sizes[index] != font_size:
+                self.backgrounds[index] = background
+                self.font_sizes[index] = font_size
+                self.invalidate(index)
+
+    def set_conflict(self, index, conflicting):
+        if self.conflicts[index] != conflicting:
+            self.conflicts[index] = conflicting
+            self.invalidate(index)
+
+    def color(self, name):
+        color = self.colors.get(name)
+        if color is None:
+            color = self.colors[name] = QtGui.QColor(name)
+        return color
+
+    def cell_font(self, point_size):
+        font = self.fonts.get(point_size)
+        if font is None:
+            font = self.fonts[point_size] = QtGui.QFont(self.font())
+            font.setPointSize(point_size)
+        return font
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        region = event.region()
+        bounds = event.rect()
+        cell = self.cell_pixels
+        size = self.size
+        last = size - 1
+
+        # Only the cells touching the dirty region are drawn
+        first_row, last_row = max(bounds.top() // cell, 0), min(bounds.bottom() // cell, last)
+        first_col, last_col = max(bounds.left() // cell, 0), min(bounds.right() // cell, last)
+        current_font = None
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                index = row * size + col
+                rect = self.cell_rect(index)
+                if not region.intersects(rect):
+                    continue
+
+                background = self.backgrounds[index]
+                if background is None:
+                    if index == self.selected and self.hasFocus():
+                        background = self.SELECTED_BACKGROUND
+                    elif self.conflicts[index]:
+                        background = self.CONFLICT_BACKGROUND
+                    else:
+                        background = self.BACKGROUND
+                painter.fillRect(rect, self.color(background))
+
+                value = self.values[index]
+                if value:
+                    if self.font_sizes[index] != current_font:
+                        current_font = self.font_sizes[index]
+                        painter.setFont(self.cell_font(current_font))
+                    painter.setPen(self.color(self.CONFLICT_TEXT if self.conflicts[index] else "black"))
+                    painter.drawText(rect, QtCore.Qt.AlignCenter, symbol(value))
+
+        # Thin grey lines between cells, thicker black ones between boxes (clipped to the dirty region)
+        extent = size * cell
+        painter.setPen(QtGui.QPen(self.color("gray"), 1))
+        for line in range(size + 1):
+            painter.drawLine(line * cell, 0, line * cell, extent)
+            painter.drawLine(0, line * cell, extent, line * cell)
+        painter.setPen(QtGui.QPen(self.color("black"), 2))
+        for line in range(self.box, size, self.box):
+            painter.drawLine(line * cell, 0, line * cell, extent)
+            painter.drawLine(0, line * cell, extent, line * cell)
+        painter.end()
+
+    def cell_at(self, pos):
+        # The cell index under a widget position, or None outside the cells
+        row, col = pos.y() // self.cell_pixels, pos.x() // self.cell_pixels
+        if 0 <= row < self.size and 0 <= col < self.size:
+            return row * self.size + col
+        return None
+
+    def event(self, event):
+        if event.type() == QtCore.QEvent.ToolTip and self.candidates is not None:
+            index = self.cell_at(event.pos())
+            if index is not None and not self.values[index]:
+                mask = self.candidates(index)
+                text = " ".join(self.symbols[d] for d in range(self.size) if mask >> d & 1) or "No candidates"
+                QtWidgets.QToolTip.showText(event.globalPos(), text, self)
+            else:
+                QtWidgets.QToolTip.hideText()
+            return True
+        return super().event(event)
+
+    def mousePressEvent(self, event):
+        index = self.cell_at(event.pos())
+        if index is not None:
+            self.select(index)
+        self.setFocus()
+
+    def select(self, index):
+        self.invalidate(self.selected)
+        self.selected = index
+        self.invalidate(index)
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        moves = {
+            QtCore.Qt.Key_Left: (0, -1), QtCore.Qt.Key_Right: (0, 1),
+            QtCore.Qt.Key_Up: (-1, 0), QtCore.Qt.Key_Down: (1, 0),
+        }
+        row, col = divmod(self.selected, self.size)
+        if key in moves:
+            row = min(max(row + moves[key][0], 0), self.size - 1)
+            col = min(max(col + moves[key][1], 0), self.size - 1)
+            self.select(row * self.size + col)
+        elif key in (QtCore.Qt.Key_Backspace, QtCore.Qt.Key_Delete, QtCore.Qt.Key_Space, QtCore.Qt.Key_0):
+            self.edit(row, col, 0)
+        elif event.text() and event.text().upper() in self.symbols:
+            # Only the board's symbols are accepted (1-9, then letters in either case; never 0)
+            self.edit(row, col, self.symbols.index(event.text().upper()) + 1)
+        else:
+            super().keyPressEvent(event)
+
+    def edit(self, row, col, value):
+        if self.editable and self.value(row, col) != value:
+            self.set_value(row, col, value)
+            self.edited.emit(row, col, value)
+
+    def focusInEvent(self, event):
+        self.invalidate(self.selected)
+        super().focusInEvent(event)
+
+    def focusOutEvent(self, event):
+        self.invalidate(self.selected)
+        super().focusOutEvent(event)
+
+
+class Effect(object):
+    """
+    One keyed animation, advanced by an Animator on every frame.
+
+    Args:
+    - key: Playing an effect cancels any effect already playing under the same key.
+    - duration: Length in milliseconds, or None to run until cancelled.
+    - easing: The QEasingCurve type that ease() applies.
+    """
+
+    def __init__(self, key, duration=None, easing=QtCore.QEasingCurve.Linear):
+        self.key = key
+        self.duration = duration
+        self.easing = QtCore.QEasingCurve(easing)
+        self.start = 0
+
+    def ease(self, progress):
+        return self.easing.valueForProgress(min(max(progress, 0.0), 1.0))
+
+    def update(self, elapsed):
+        # Draws the frame `elapsed` milliseconds after the effect started
+        pass
+
+    def finish(self):
+        # Called once when the effect has run for its whole duration
+        pass
+
+    def cancel(self):
+        # Called when the effect is cancelled or replaced; by default it jumps to its end state
+        self.finish()
+
+
+class Frames(Effect):
+    """
+    Calls `callback()` on every frame until cancelled.
+    """
+
+    def __init__(self, key, callback):
+        super().__init__(key)
+        self.callback = callback
+
+    def update(self, elapsed):
+        self.callback()
+
+    def cancel(self):
+        pass
+
+
+class Delay(Effect):
+    """
+    Calls `callback()` once after `duration` milliseconds, unless cancelled first.
+    """
+
+    def __init__(self, key, duration, callback):
+        super().__init__(key, duration)
+        self.callback = callback
+
+    def finish(self):
+        self.callback()
+
+    def cancel(self):
+        pass
+
+
+class Ripple(Effect):
+    """
+    Pulses the board green in square rings spreading out from the centre cell.
+
+    Each ring starts `delay` milliseconds after the one inside it and pulses for three delays: its
+    background goes from light green (#a8f0a2) to dark green (#4caf50) and back, with the font
+    growing from 16 to 20 points and back, along the easing curve. Then the ring is reset.
+    """
+    LIGHT = "#a8f0a2"
+    DARK = "#4caf50"
+    STEPS = 8  # Shades per pulse; a cell is only repainted when its shade changes
+
+    def __init__(self, board, delay=100, easing=QtCore.QEasingCurve.InOutSine):
+        center = board.size // 2
+        layers = {}
+        for i in range(board.size):
+            for j in range(board.size):
+                layers.setdefault(max(abs(i - center), abs(j - center)), []).append((i, j))
+
+        # Layer 0 is the center, layer 1 its neighbors, etc.
+        self.layers = [layers[d] for d in sorted(layers)]
+        super().__init__("ripple", (len(self.layers) + 2) * delay, easing)
+        self.board = board
+        self.delay = delay
+
+        light, dark = QtGui.QColor(self.LIGHT), QtGui.QColor(self.DARK)
+        self.styles = []
+        for step in range(self.STEPS + 1):
+            t = step / self.STEPS
+            color = QtGui.QColor(
+                round(light.red() + (dark.red() - light.red()) * t),
+                round(light.green() + (dark.green() - light.green()) * t),
+                round(light.blue() + (dark.blue() - light.blue()) * t),
+            )
+            self.styles.append((color.name(), round(16 + 4 * t)))
+
+    def update(self, elapsed):
+        for layer, cells in enumerate(self.layers):
+            progress = (elapsed - layer * self.delay) / (3 * self.delay)
+            if progress < 0:
+                break  # Outer rings have not started yet
+            if progress >= 1:
+                self.board.set_cell_style(cells)
+            else:
+                level = self.ease(1 - abs(2 * progress - 1))
+                self.board.set_cell_style(cells, *self.styles[round(level * self.STEPS)])
+
+    def finish(self):
+        for cells in self.layers:
+            self.board.set_cell_style(cells)
+
+
+class Flash(Effect):
+    """
+    Flashes some cells salmon and white, `period` milliseconds each, `flashes` times, then resets them.
+    """
+
+    def __init__(self, board, cells, flashes=3, period=500):
+        super().__init__("flash", flashes * period)
+        self.board = board
+        self.cells = cells
+        self.period = period
+
+    def update(self, elapsed):
+        self.board.set_cell_style(self.cells, "salmon" if (elapsed // self.period) % 2 == 0 else "white")
+
+    def finish(self):
+        self.board.set_cell_style(self.cells)
+
+
+class Animator(QtCore.QObject):
+    """
+    Plays every animation of the window from one frame clock.
+
+    A single timer ticks every FRAME_INTERVAL milliseconds while any effect is playing and stops when
+    none are, so the number of timers never depends on the board size or on how many effects run.
+    Each tick advances every effect; their cell changes only mark cells dirty, and the board repaints
+    all of them together after the tick.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.effects = {}
+        self.clock = QtCore.QElapsedTimer()
+        self.clock.start()
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(FRAME_INTERVAL)
+        self.timer.timeout.connect(self.tick)
+
+    def play(self, effect):
+        """
+        Starts an effect, replacing (and cancelling) any effect with the same key.
+        """
+        self.cancel(effect.key)
+        effect.start = self.clock.elapsed()
+        self.effects[effect.key] = effect
+        effect.update(0)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def cancel(self, key):
+        """
+        Stops the effect playing under `key`, if any.
+        """
+        effect = self.effects.pop(key, None)
+        if effect is not None:
+            effect.cancel()
+        if not self.effects:
+            self.timer.stop()
+
+    def cancel_all(self):
+        for key in list(self.effects):
+            self.cancel(key)
+
+    def is_playing(self, key):
+        return key in self.effects
+
+    def tick(self):
+        now = self.clock.elapsed()
+        for key, effect in list(self.effects.items()):
+            if self.effects.get(key) is not effect:
+                continue  # Cancelled or replaced by an effect that finished earlier in this tick
+            elapsed = now - effect.start
+            if effect.duration is not None and elapsed >= effect.duration:
+                del self.effects[key]
+                effect.finish()
+            else:
+                effect.update(elapsed)
+        if not self.effects:
+            self.timer.stop()
+
 
 class Ui_SudokuGrid(object):
-    def setupUi(self, SudokuGrid):
+    def setupUi(self, SudokuGrid, size=9):
+        # Larger boards get smaller cells so a 25x25 board still fits on the screen
+        self.size = size
+        self.box = math.isqrt(size)
+        self.cell_font_size = {9: 12, 16: 10, 25: 9}[size]
+        cell_pixels = {9: 40, 16: 34, 25: 28}[size]
+
         SudokuGrid.setObjectName("SudokuGrid")
-        SudokuGrid.resize(400, 450)
+        SudokuGrid.resize(size * cell_pixels + 40, size * cell_pixels + 90)
         self.gridLayout = QtWidgets.QGridLayout(SudokuGrid)
         self.gridLayout.setContentsMargins(20, 20, 20, 20)
         self.gridLayout.setSpacing(0)
         self.gridLayout.setObjectName("gridLayout")
 
-        # Create a 9x9 grid of QLineEdit widgets
-        self.cells = []
-        self.initial_styles = []
-
-        for row in range(9):
-            row_cells = []
-            row_styles = []
-
-            for col in range(9):
-                line_edit = QtWidgets.QLineEdit(SudokuGrid)
-                line_edit.setMaximumSize(QtCore.QSize(40, 40))
-                font = QtGui.QFont()
-                font.setPointSize(12)
-                line_edit.setFont(font)
-                line_edit.setAlignment(QtCore.Qt.AlignCenter)
-                line_edit.setObjectName(f"cell_{row}_{col}")
-
-                # Set a validator to only allow integers between 1-9 (exclude 0)
-                validator = QtGui.QRegExpValidator(QtCore.QRegExp("[1-9]"), line_edit)
-                line_edit.setValidator(validator)
-
-                # Limit input to 1 character
-                line_edit.setMaxLength(1)
-
-                # Style for thicker borders at specific rows and columns
-                style = "border: 1px solid gray;"
-
-                if row == 2 or row == 5:  # Bottom of 3rd and 6th rows (zero-indexed)
-                    style += "border-bottom: 1.5px solid black;"
-                if col == 2 or col == 5:  # Right of 3rd and 6th columns
-                    style += "border-right: 1.5px solid black;"
-                if row == 3 or row == 6:  # Top of 4th and 8th rows
-                    style += "border-top: 1.5px solid black;"
-                if col == 3 or col == 6:  # Left of 4th and 8th columns
-                    style += "border-left: 1.5px solid black;"
-
-                # Store the initial style
-                row_styles.append(style)
-                line_edit.setStyleSheet(style)
-
-                self.gridLayout.addWidget(line_edit, row, col, 1, 1)
-                row_cells.append(line_edit)
-            
-            self.cells.append(row_cells)
-            self.initial_styles.append(row_styles)
+        # The board draws all of its cells itself
+        self.board = BoardWidget(size, cell_pixels, self.cell_font_size, SudokuGrid)
+        self.board.setObjectName("board")
+        self.gridLayout.addWidget(self.board, 0, 0, 1, 1, QtCore.Qt.AlignCenter)
+
+        # Duplicates and candidates are tracked live as the user types
+        self.conflict_index = core.ConflictIndex(self.box)
+        self.board.candidates = self.conflict_index.candidates
+        self.board.edited.connect(self.on_cell_edited)
 
         # Add a solve button below the grid
         self.solveButton = QtWidgets.QPushButton(SudokuGrid)
         self.solveButton.setText("Solve")
         self.solveButton.setObjectName("solveButton")
-        self.gridLayout.addWidget(self.solveButton, 10, 0, 1, 9)  # Span across all columns
+        self.gridLayout.addWidget(self.solveButton, 1, 0, 1, 1)
         self.solveButton.setStyleSheet("""margin-top: 5px;
                                        font-size: 16px;""")
         self.solveButton.setMinimumSize(200, 35)
@@ -69,16 +543,30 @@ class Ui_SudokuGrid(object):
         # Add a clear button below the grid
         self.clearButton = QtWidgets.QPushButton(SudokuGrid)
         self.clearButton.setText("Clear")
-        self.gridLayout.addWidget(self.clearButton, 11, 0, 1, 9)  # Span across all columns
+        self.gridLayout.addWidget(self.clearButton, 2, 0, 1, 1)
         self.clearButton.setStyleSheet("font-size: 16px;")
         self.clearButton.setMinimumSize(200, 30)
 
+        # Add a status line for the search statistics below the buttons
+        self.statsLabel = QtWidgets.QLabel(SudokuGrid)
+        self.statsLabel.setObjectName("statsLabel")
+        self.statsLabel.setAlignment(QtCore.Qt.AlignCenter)
+        self.statsLabel.setStyleSheet("color: gray; font-size: 11px;")
+        self.gridLayout.addWidget(self.statsLabel, 3, 0, 1, 1)
+
 
         self.retranslateUi(SudokuGrid)
         QtCore.QMetaObject.connectSlotsByName(SudokuGrid)
 
-        # Initialize animation state
+        # Initialize animation state; every effect runs on the animator's single frame clock
         self.animation_in_progress = False
+        self.animator = Animator(SudokuGrid)
+
+        # Initialize solver state
+        self.solve_thread = None
+        self.retired_threads = set()  # Discarded searches still winding down, kept alive until they exit
+        self.solve_timeout = DEFAULT_SOLVE_TIMEOUT
+        self.solution_cache = core.SolutionCache(DEFAULT_CACHE_SIZE)
 
     def retranslateUi(self, SudokuGrid):
         _translate = QtCore.QCoreApplication.translate
@@ -87,34 +575,34 @@ class Ui_SudokuGrid(object):
     def solve_sudoku(self):
         """
         Solves the Sudoku puzzle by retrieving the grid values from the UI, checking for duplicates,
-        and then using a backtracking algorithm to solve the puzzle. The solution process is animated.
-        Once the puzzle is solved, the grid is updated with the solution and a message box is displayed.
+        and then running the solver on a worker thread. The solution process is animated.
+        Once the puzzle is solved, the grid is updated with the solution.
+
+        While a search is running the Solve button reads "Cancel", and clicking it stops the search.
 
         Steps:
         1. Retrieve the grid values from the UI.
         2. Check for duplicates in the grid. If duplicates are found, the solving process is aborted.
         3. Start an animation to show that the algorithm is working.
-        4. Use a backtracking algorithm to solve the grid.
-        5. If solved, stop the animation and update the UI with the solution. Show a success message.
-        6. If unable to solve, display a warning message.
-        """
-        grid_values = []
-        original_values = []
-
-        # Step 1: Retrieve the grid values from the UI
-        for row in range(9):
-            row_values = []
-            original_row = []
-            for col in range(9):
-                value = self.cells[row][col].text()
-                if value == "":
-                    value = "0"
-                    original_row.append(0)
-                else:
-                    original_row.append(int(value))
-                row_values.append(int(value))
-            grid_values.append(row_values)
-            original_values.append(original_row)
+        4. Start the solver on a worker thread, limited to solve_timeout seconds. Puzzles with more than
+           one solution get a warning instead of an arbitrary answer.
+        5. The worker reports back through signals handled by the on_solve_* methods.
+        """
+        if self.solve_thread is not None:
+            self.cancel_solve()  # The button currently reads "Cancel"
+            return
+
+        # A new attempt supersedes the effects of the last one, including an answer still waiting to
+        # be revealed, which would otherwise end the new search animation when its delay ran out
+        if self.animator.is_playing("reveal"):
+            self.animator.cancel("reveal")
+            self.stop_animation()
+        self.animator.cancel("ripple")
+        self.animator.cancel("flash")
+
+        # Step 1: Retrieve the grid values, which the conflict index already holds
+        grid_values = self.current_grid()
+        original_values = [row[:] for row in grid_values]
 
         self.original_values = original_values
 
@@ -126,103 +614,113 @@ class Ui_SudokuGrid(object):
         self.start_animation(grid_values, original_values)
 
         # Step 4: Run the solving algorithm in the background
-        solved = self.solve(grid_values)
+        self.solve_thread = SolveThread(
+            grid_values, self.solve_timeout, self.solution_cache, self.conflict_index.candidate_masks()
+        )
+        self.solve_thread.solved.connect(self.on_solve_solved)
+        self.solve_thread.unsolvable.connect(self.on_solve_unsolvable)
+        self.solve_thread.ambiguous.connect(self.on_solve_ambiguous)
+        self.solve_thread.cancelled.connect(self.on_solve_cancelled)
+        self.solve_thread.finished.connect(self.on_solve_finished)
+        self.solveButton.setText("Cancel")
+        self.solve_thread.start()
+
+    def cancel_solve(self):
+        """
+        Asks the running search to stop. The worker then emits cancelled(False).
+        """
+        if self.solve_thread is not None:
+            self.solve_thread.cancel()
 
+    def on_solve_solved(self, grid_values, stats):
         # Step 5: Once solved, stop the animation and update the grid with the solution
-        if solved:
-            QtCore.QTimer.singleShot(1000, lambda: self.stop_animation_and_show_solution(grid_values))
-        else:
-            QtWidgets.QMessageBox.warning(None, "Error", "Unable to solve the Sudoku puzzle!")
+        self.animator.play(Delay("reveal", 1000, lambda: self.stop_animation_and_show_solution(grid_values, stats)))
+
+    def on_solve_unsolvable(self):
+        self.stop_animation()
+        QtWidgets.QMessageBox.warning(None, "Error", "Unable to solve the Sudoku puzzle!")
+
+    def on_solve_ambiguous(self):
+        self.stop_animation()
+        QtWidgets.QMessageBox.warning(
+            None, "Multiple solutions", "This puzzle has more than one solution. Add more clues and try again."
+        )
+
+    def on_solve_cancelled(self, timed_out):
+        self.stop_animation()
+        if timed_out:
+            QtWidgets.QMessageBox.warning(
+                None, "Error", f"Gave up after {self.solve_timeout:g} seconds without finding a solution."
+            )
+
+    def on_solve_finished(self):
+        # The thread has exited: restore the Solve button and drop the reference
+        self.solve_thread.deleteLater()
+        self.solve_thread = None
+        self.solveButton.setText("Solve")
 
+    def retire_solve(self):
+        """
+        Discards the running search: it is cancelled and winds down in the background with none of its
+        signals connected, while the window is free to start a new one straight away.
+        """
+        thread = self.solve_thread
+        self.solve_thread = None
+        for signal in (thread.solved, thread.unsolvable, thread.ambiguous, thread.cancelled, thread.finished):
+            signal.disconnect()
+        thread.cancel()
+        self.retired_threads.add(thread)
+        thread.finished.connect(lambda: self.on_retired_finished(thread))
+        self.solveButton.setText("Solve")
 
-    def stop_animation_and_show_solution(self, grid_values):
+    def on_retired_finished(self, thread):
+        self.retired_threads.discard(thread)
+        thread.deleteLater()
+
+    def stop_animation(self):
+        """
+        Stops the solving animation and puts the user's original values back into the grid.
+        """
+        self.animator.cancel("search")
+        self.animation_in_progress = False
+        self.board.editable = True
+        self.board.set_grid(self.original_values)
+
+
+    def stop_animation_and_show_solution(self, grid_values, stats=None):
         """
         Stops the animation and updates the grid with the solved values.
 
         This method stops the solving animation and applies a ripple effect
         by changing the background color of the center subgrid before displaying the solution.
+        A summary of the search statistics, or a note that the answer came from the cache, is shown
+        below the buttons.
         """
-        # Stop the animation timer
-        self.timer.stop()
+        # Stop the search animation
+        self.animator.cancel("search")
+        self.animation_in_progress = False
+        self.board.editable = True
 
         # Update the grid with the solved values
         self.update_grid_with_solution(grid_values)
+        if stats is not None:
+            self.statsLabel.setText(f"Solved: {stats.summary()}")
+        else:
+            self.statsLabel.setText("Solved from cache")
 
         # Start the ripple animation effect from the center subgrid
         self.start_ripple_effect()
 
     def start_ripple_effect(self):
         """
-        Starts a ripple animation effect beginning at the center cell (the 41st square)
-        and expanding outward in concentric rings. The effect is staggered by one phase:
-        when the center cell is in a later phase, its neighbors are one phase behind.
-        
-        Each cell follows a 4-phase sequence:
-        Phase 0: Light green (#a8f0a2) and font size 13
-        Phase 1: Dark green (#4caf50) and font size 14
-        Phase 2: Light green (#a8f0a2) and font size 13
-        Phase 3: Reset to original style and font size 12
-        """
-        center = 4
-        layers = {}
-        for i in range(9):
-            for j in range(9):
-                d = max(abs(i - center), abs(j - center))
-                layers.setdefault(d, []).append((i, j))
-        
-        # Create a sorted list of layers (layer 0 is the center, layer 1 its neighbors, etc.)
-        ripple_layers = [layers[d] for d in sorted(layers.keys())]
-        
-        phase_delay = 100
-        
-        # Define the phase sequence as tuples: (phase offset, color, font size)
-        # When color is None the cell resets.
-        color_sequence = [
-            (0, '#a8f0a2', 16),  # Phase 0: Light green, font size 13
-            (1, '#4caf50', 20),  # Phase 1: Dark green, font size 14
-            (2, '#a8f0a2', 16),  # Phase 2: Light green, font size 13
-            (3, None, 12)       # Phase 3: Reset to original style and font size 12
-        ]
-        
-        # Schedule the animation for each layer with an offset of one phase per layer.
-        for layer_index, cells in enumerate(ripple_layers):
-            for phase_offset, color, font_size in color_sequence:
-                # Calculate the delay as the sum of the layer offset and the phase offset.
-                delay = (layer_index + phase_offset) * phase_delay
-                # Use lambda defaults to capture the current values of cells, color, and font_size.
-                QtCore.QTimer.singleShot(
-                    delay,
-                    lambda cells=cells, color=color, font_size=font_size: self.apply_ripple(cells, color, font_size)
-                )
-
-
-    def apply_ripple(self, cells, color, font_size):
-        """
-        Applies a given background color and font size to a list of cells.
-        If color is None, resets each cell to its original style and font size (12).
-        
-        Args:
-        - cells (list of tuples): List of (row, col) pairs for the cells to update.
-        - color (str or None): The background color to apply (e.g., '#a8f0a2'). If None, the cell style is reset.
-        - font_size (int): The font size to set.
-        """
-        for i, j in cells:
-            if color is None:
-                # Reset to the original style stored during setup.
-                self.cells[i][j].setStyleSheet(self.initial_styles[i][j])
-                self.cells[i][j].setFont(QtGui.QFont("Arial", 12))
-            else:
-                # Apply the new background color and font size.
-                # Append the original style for borders, etc.
-                new_style = f"background-color: {color}; font-size: {font_size}pt;" + self.initial_styles[i][j]
-                self.cells[i][j].setStyleSheet(new_style)
-                
-                # Also update the cell's font explicitly.
-                font = self.cells[i][j].font()
-                font.setPointSize(font_size)
-                self.cells[i][j].setFont(font)
-
+        Starts a ripple animation effect beginning at the center cell (the 41st square on 9x9)
+        and expanding outward in concentric rings, one ring every 100 ms.
 
+        Each cell pulses from light green (#a8f0a2) to dark green (#4caf50) and back, with its font
+        growing from 16 to 20 points and back, then resets to its original style and font size.
+        Solving or clearing again cancels the ripple.
+        """
+        self.animator.play(Ripple(self.board))
 
     def update_grid_with_solution(self, grid_values):
         """
@@ -235,15 +733,14 @@ class Ui_SudokuGrid(object):
         - grid_values: A 2D list representing the solved Sudoku grid.
         """
         # Update the grid cells with the solution after the algorithm completes
-        for row in range(9):
-            for col in range(9):
-                self.cells[row][col].setText(str(grid_values[row][col]))  # Set the solved value
+        self.board.set_grid(grid_values)
+        self.show_conflicts(self.conflict_index.load([value for row in grid_values for value in row]))
 
     def update_grid(self):
         """
         Updates the grid with the next set of values during the solving animation.
 
-        This method is called periodically by the animation timer. It increments the current value
+        This method is called on every frame by the animator. It increments the current value
         of the empty cells in the grid and updates the UI with the new values. If all cells have been filled,
         the animation stops and the solution is displayed.
         """
@@ -254,17 +751,17 @@ class Ui_SudokuGrid(object):
         all_filled = True
 
         # Loop through the grid and cycle the values
-        for row in range(9):
-            for col in range(9):
+        for row in range(self.size):
+            for col in range(self.size):
                 if self.original_values[row][col] == 0:  # Only animate empty cells
                     current_value = self.animation_values[row][col]
 
-                    # Increment the value and loop back to 1 after 9
-                    new_value = current_value + 1 if current_value < 9 else 1
+                    # Increment the value and loop back to 1 after the largest digit
+                    new_value = current_value + 1 if current_value < self.size else 1
                     self.animation_values[row][col] = new_value  # Increment the value
 
-                    # Update the QLineEdit widget with the new value
-                    self.cells[row][col].setText(str(new_value))
+                    # Update the board; it repaints the changed cells together in one pass
+                    self.board.set_value(row, col, new_value)
 
                     # If this cell still needs to be updated, mark it as not filled
                     if new_value != 1:
@@ -276,8 +773,8 @@ class Ui_SudokuGrid(object):
         """
         Starts the animation that visually simulates the Sudoku solving process.
 
-        This method initializes the grid with random values for animation and sets up a timer that periodically
-        updates the grid. It also flags that the animation is in progress.
+        This method initializes the grid with random values for animation and plays a "search" effect that
+        updates the grid on every frame. It also flags that the animation is in progress.
 
         Args:
         - grid_values: A 2D list representing the initial grid values.
@@ -287,170 +784,125 @@ class Ui_SudokuGrid(object):
         self.grid_values = grid_values
         self.original_values = original_values
 
-        # Initialize the random values for animation (1-9)
-        self.animation_values = [[random.randint(1, 9) if self.original_values[row][col] == 0 else self.original_values[row][col]
-                                for col in range(9)] for row in range(9)]
+        # Initialize the random values for animation (1 to the largest digit)
+        self.animation_values = [[random.randint(1, self.size) if self.original_values[row][col] == 0 else self.original_values[row][col]
+                                for col in range(self.size)] for row in range(self.size)]
 
-        # Create a QTimer to update the grid every 0.2 seconds
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.update_grid)  # Connect the timeout to the update_grid method
-        self.timer.start(20)  # 200ms = 0.2 seconds
+        # Step the values on every animation frame
+        self.animator.play(Frames("search", self.update_grid))
 
-        # Set animation in progress flag
+        # Set animation in progress flag; the board takes no input until the animation ends
         self.animation_in_progress = True
+        self.board.editable = False
 
 
     def solve(self, grid):
         """
-        Solves the Sudoku puzzle using the backtracking algorithm.
+        Solves the Sudoku puzzle using the bitmask constraint engine, answering from the solution cache
+        when this puzzle (or one equivalent to it under relabelling, row/column swaps or transposing)
+        was solved before.
 
-        This method recursively attempts to fill the grid using a backtracking approach, where it places a valid number
-        in each empty cell and backtracks if it encounters an invalid state.
+        The engine tracks row, column and subgrid usage as bitmasks and always branches on the empty
+        cell with the fewest candidates. It returns the same solution the row-major backtracker would.
 
         Args:
-        - grid: A 2D list representing the current state of the Sudoku grid.
+        - grid: A 2D list representing the current state of the Sudoku grid. It is filled in place.
 
         Returns:
         - True if the puzzle is successfully solved, False otherwise.
         """
-        def is_valid(num, row, col):
-            # Check row
-            if num in grid[row]:
-                return False
-
-            # Check column
-            for r in range(9):
-                if grid[r][col] == num:
-                    return False
-
-            # Check 3x3 subgrid
-            start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-            for r in range(start_row, start_row + 3):
-                for c in range(start_col, start_col + 3):
-                    if grid[r][c] == num:
-                        return False
-            return True
+        return self.solution_cache.solve(grid)
 
-        def backtrack():
-            for row in range(9):
-                for col in range(9):
-                    if grid[row][col] == 0:  # Find an empty cell
-                        for num in range(1, 10):
-                            if is_valid(num, row, col):
-                                grid[row][col] = num  # Try placing the number
 
-                                if backtrack():  # Recursively attempt to solve
-                                    return True
-                                grid[row][col] = 0  # Undo if not valid
-                        return False  # No valid number found, backtrack
-            return True  # Solved
+    def load_grid(self, grid_values):
+        """
+        Shows a puzzle, e.g. one read from a corpus with core.corpus.read_puzzle(), replacing the
+        board, stopping any animation and clearing the statistics line.
 
-        return backtrack()
+        Args:
+        - grid_values: A list of row lists or a core.Board of this window's size, with 0 for empty cells.
+        """
+        if isinstance(grid_values, core.Board):
+            grid_values = grid_values.to_rows()
+        if len(grid_values) != self.size:
+            raise ValueError(f"expected a {self.size}x{self.size} puzzle, got {len(grid_values)} rows")
+        self.clear_sudoku()
+        self.board.set_grid(grid_values)
+        self.show_conflicts(self.conflict_index.load([value for row in grid_values for value in row]))
+
+    def current_grid(self):
+        """
+        Returns the puzzle on the board as a new list of row lists (0 for empty), ready for
+        core.CorpusWriter.add() or core.format_grid().
+        """
+        cells = self.conflict_index.cells
+        return [cells[row * self.size:row * self.size + self.size] for row in range(self.size)]
 
+    def read_grid_text(self):
+        """
+        Reads the UI cells into the text format (81 characters on 9x9), using `0` for empty cells.
+
+        Returns:
+        - The grid row by row as a single string.
+        """
+        return self.board.text()
 
     def find_duplicates(self):
         """
         Checks the Sudoku grid for duplicate values in rows, columns, or subgrids.
 
-        This method scans the grid for any duplicates and flashes the corresponding row, column, or subgrid
-        if a duplicate is found. If any duplicates are detected, the method stops the solving process and
+        The conflict index already knows every duplicate, so no rescan is needed; this method flashes the
+        row, column, or subgrid of the first one. If any duplicates are detected, the method stops the solving process and
         returns True. Otherwise, it returns False.
 
         Returns:
         - True if duplicates are found, False if no duplicates are detected.
         """
-        # Check rows for duplicates
-        for row in range(9):
-            row_values = set()
-            for col in range(9):
-                value = self.original_values[row][col]
-                if value != 0:
-                    if value in row_values:
-                        self.flash_row(row)  # Flash the row
-                        return True  # Duplicate found, return True
-                    row_values.add(value)
-
-        # Check columns for duplicates
-        for col in range(9):
-            col_values = set()
-            for row in range(9):
-                value = self.original_values[row][col]
-                if value != 0:
-                    if value in col_values:
-                        self.flash_column(col)  # Flash the column
-                        return True  # Duplicate found, return True
-                    col_values.add(value)
-
-        # Check 3x3 subgrids for duplicates
-        for row in range(0, 9, 3):
-            for col in range(0, 9, 3):
-                subgrid_values = set()
-                for i in range(3):
-                    for j in range(3):
-                        value = self.original_values[row + i][col + j]
-                        if value != 0:
-                            if value in subgrid_values:
-                                self.flash_subgrid(row, col)  # Flash the subgrid
-                                return True  # Duplicate found, return True
-                            subgrid_values.add(value)
-
-        return False  # No duplicates found
+        duplicate = self.conflict_index.duplicate()
+        if duplicate is None:
+            return False  # No duplicates found
+
+        unit, index = duplicate
+        if unit == "row":
+            self.flash_row(index)  # Flash the row
+        elif unit == "column":
+            self.flash_column(index)  # Flash the column
+        else:
+            self.flash_subgrid(self.box * (index // self.box), self.box * (index % self.box))  # Flash the subgrid
+        return True  # Duplicate found, return True
 
 
     def clear_sudoku(self):
-        for row in self.cells:
-            for cell in row:
-                cell.clear()
+        if self.solve_thread is not None:
+            self.retire_solve()
+
+        # Stop everything still playing, including a solution waiting to be revealed
+        self.animator.cancel_all()
+        self.animation_in_progress = False
+        self.board.editable = True
+        self.board.clear()
+        self.show_conflicts(self.conflict_index.load([0] * (self.size * self.size)))
+        self.statsLabel.clear()
+
+    def on_cell_edited(self, row, col, value):
+        # O(1) update of the per-unit counters; only cells whose conflict status changed are repainted
+        self.show_conflicts(self.conflict_index.set(row * self.size + col, value))
+
+    def show_conflicts(self, cells):
+        for cell in cells:
+            self.board.set_conflict(cell, cell in self.conflict_index.conflicts)
 
     def flash_row(self, row):
         # Flash the row 3 times
-        for i in range(3):  # Flash 3 times
-            QtCore.QTimer.singleShot(i * 500, lambda i=i: self.set_row_background(row, 'salmon' if i % 2 == 0 else 'white'))
-        QtCore.QTimer.singleShot(3 * 500, lambda: self.reset_row_background(row))  # Reset after the third flash
+        self.animator.play(Flash(self.board, [(row, col) for col in range(self.size)]))
 
     def flash_column(self, col):
         # Flash the column 3 times
-        for i in range(3):
-            QtCore.QTimer.singleShot(i * 500, lambda i=i: self.set_column_background(col, 'salmon' if i % 2 == 0 else 'white'))
-        QtCore.QTimer.singleShot(3 * 500, lambda: self.reset_column_background(col))  # Reset after the third flash
+        self.animator.play(Flash(self.board, [(row, col) for row in range(self.size)]))
 
     def flash_subgrid(self, row, col):
         # Flash the subgrid 3 times
-        for i in range(3):
-            QtCore.QTimer.singleShot(i * 500, lambda i=i: self.set_subgrid_background(row, col, 'salmon' if i % 2 == 0 else 'white'))
-        QtCore.QTimer.singleShot(3 * 500, lambda: self.reset_subgrid_background(row, col))  # Reset after the third flash
-
-    def set_row_background(self, row, color):
-        # Set the row background to the error colour (salmon)
-        for col in range(9):
-            self.cells[row][col].setStyleSheet(f"background-color: {color};")
-
-    def set_column_background(self, col, color):
-        # Set the column background to the error colour (salmon)
-        for row in range(9):
-            self.cells[row][col].setStyleSheet(f"background-color: {color};")
-
-    def set_subgrid_background(self, row, col, color):
-        # Set the subgrid background to the error colour (salmon)
-        for i in range(3):
-            for j in range(3):
-                self.cells[row + i][col + j].setStyleSheet(f"background-color: {color};")
-
-    def reset_row_background(self, row):
-        # Reset the row background to the initial style
-        for col in range(9):
-            self.cells[row][col].setStyleSheet(self.initial_styles[row][col])
-
-    def reset_column_background(self, col):
-        # Reset the column background to the initial style
-        for row in range(9):
-            self.cells[row][col].setStyleSheet(self.initial_styles[row][col])
-
-    def reset_subgrid_background(self, row, col):
-        # Reset the subgrid background to the initial style
-        for i in range(3):
-            for j in range(3):
-                self.cells[row + i][col + j].setStyleSheet(self.initial_styles[row + i][col + j])
+        self.animator.play(Flash(self.board, [(row + i, col + j) for i in range(self.box) for j in range(self.box)]))
 
 
 
@@ -1,14 +1,49 @@
+import argparse
 import sys
 from PyQt5 import QtWidgets
-from SudokuGrid import Ui_SudokuGrid
+from SudokuGrid import BOARD_SIZES, DEFAULT_CACHE_SIZE, DEFAULT_SOLVE_TIMEOUT, Ui_SudokuGrid
+from sudoku import core
+from sudoku.cli import non_negative_int
+from sudoku.core import corpus
 
 def main():
-    app = QtWidgets.QApplication(sys.argv)
+    # Leave any arguments we don't recognise for Qt
+    parser = argparse.ArgumentParser(description="Sudoku Solver")
+    parser.add_argument("--size", type=int, choices=BOARD_SIZES, default=9,
+                        help="rows on the board: 9, 16 or 25 (default: 9)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_SOLVE_TIMEOUT,
+                        help=f"seconds before a search is abandoned (default: {DEFAULT_SOLVE_TIMEOUT})")
+    parser.add_argument("--cache", metavar="FILE",
+                        help="load solved puzzles from FILE at startup and save them back on exit")
+    parser.add_argument("--cache-size", type=non_negative_int, default=DEFAULT_CACHE_SIZE,
+                        help=f"solved puzzles to remember, by symmetry class (default: {DEFAULT_CACHE_SIZE})")
+    parser.add_argument("--open", metavar="FILE",
+                        help="show a puzzle from FILE, a packed corpus or a text file of puzzles; "
+                             "the board size follows the puzzle")
+    parser.add_argument("--puzzle", type=int, default=1,
+                        help="which puzzle of --open to show, counting from 1 (default: 1)")
+    args, qt_args = parser.parse_known_args()
+
+    puzzle = None
+    if args.open:
+        try:
+            puzzle = corpus.read_puzzle(args.open, args.puzzle - 1)
+        except (OSError, IndexError, ValueError) as error:
+            parser.error(f"cannot open puzzle {args.puzzle} of {args.open}: {error}")
+        args.size = len(puzzle)
+
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
     
     # Create the Sudoku window and set up the UI
     window = QtWidgets.QWidget()
     ui = Ui_SudokuGrid()
-    ui.setupUi(window)  # Setup the UI for the window
+    ui.setupUi(window, args.size)  # Setup the UI for the window
+    ui.solve_timeout = args.timeout
+    ui.solution_cache = core.SolutionCache(args.cache_size, args.cache)
+    if puzzle is not None:
+        ui.load_grid(puzzle)
+    if args.cache:
+        app.aboutToQuit.connect(ui.solution_cache.save)
 
     window.show()  # Show the window
     window.setFixedSize(window.size()) # Fix the window size
@@ -0,0 +1,6 @@
+"""
+Sudoku solving toolkit.
+
+The pure-Python solving logic lives in `sudoku.core` and does not import PyQt5, so it can be used
+from batch workers and scripts without paying for the GUI.
+"""
@@ -0,0 +1,288 @@
+"""
+Streaming batch processing of puzzle files over a process pool.
+
+Puzzles are read lazily, grouped into chunks and handed to worker processes with a bounded number
+of chunks in flight, so memory use stays constant however large the input is. A chunk is either a
+list of text lines or a CorpusSpan naming a range of a packed corpus, which each worker reads from
+its own mapping of the file instead of receiving the puzzles.
+"""
+
+import collections
+import concurrent.futures
+import functools
+import itertools
+import json
+import os
+
+from sudoku import core
+
+UNSOLVABLE = "unsolvable"
+INVALID = "invalid"
+TIMEOUT = "timeout"
+FAILED = "failed"
+
+_cache = None  # Per-process SolutionCache, created on first use by solve_chunk
+_corpora = {}  # Per-process open Corpus objects by path, for CorpusSpan chunks
+
+
+def read_puzzles(stream):
+    """
+    Yields puzzle lines from a text stream, skipping blank lines and `#` comments.
+
+    Args:
+    - stream: An iterable of text lines, such as an open file or sys.stdin.
+    """
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def chunked(items, size):
+    """
+    Groups an iterable into lists of at most `size` items, without reading ahead further.
+
+    Args:
+    - items: Any iterable.
+    - size: The maximum number of items per chunk.
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CorpusSpan(object):
+    """
+    A chunk of puzzles start..stop-1 from a packed corpus file (see core.corpus).
+    """
+
+    def __init__(self, path, start, stop):
+        self.path = path
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def puzzles(self):
+        # Grids sliced out of this process's mapping of the file, skipping the text format
+        corpus = _corpora.get(self.path)
+        if corpus is None:
+            corpus = _corpora[self.path] = core.Corpus(self.path)
+        return [corpus.grid(index) for index in range(self.start, self.stop)]
+
+
+def corpus_spans(path, size):
+    """
+    Splits a packed corpus into CorpusSpan chunks of at most `size` puzzles.
+    """
+    with core.Corpus(path) as corpus:
+        count = len(corpus)
+    for start in range(0, count, size):
+        yield CorpusSpan(path, start, min(start + size, count))
+
+
+def _puzzles(chunk):
+    # The puzzles of a chunk: text lines, or grids for a corpus span
+    return chunk.puzzles() if isinstance(chunk, CorpusSpan) else chunk
+
+
+def _parse(puzzle):
+    # A grid from a text line (None if it is not a valid puzzle) or an already unpacked grid
+    if not isinstance(puzzle, str):
+        return puzzle
+    try:
+        return core.parse_grid(puzzle)
+    except core.GridError:
+        return None
+
+
+def solve_line(line, engine=None, stats=None, cache=None, timeout=None, split_workers=None):
+    """
+    Solves one puzzle given in the text format (see core.parse_grid), of any supported size.
+
+    Args:
+    - line: The puzzle text, or a list of row lists already unpacked from a corpus.
+    - engine: The solving engine name, one of core.ENGINES (default: chosen by board size).
+    - stats: Optional SolveStats to collect search statistics into.
+    - cache: Optional SolutionCache to answer repeated (or equivalent) puzzles from.
+    - timeout: Optional time budget in seconds for this puzzle.
+    - split_workers: If set, split this puzzle's search over that many processes with
+      core.solve_parallel (the cache is then not used).
+
+    Returns:
+    - The solution in the same format, or UNSOLVABLE / INVALID when there is none, or TIMEOUT when
+      the budget ran out first.
+    """
+    grid = _parse(line)
+    if grid is None or core.find_duplicates(grid) is not None:
+        return INVALID
+    if split_workers:
+        solve = functools.partial(core.solve_parallel, workers=split_workers)
+    else:
+        solve = cache.solve if cache is not None else core.solve
+    token = core.CancelToken(timeout) if timeout is not None else None
+    try:
+        if not solve(grid, engine=engine, token=token, stats=stats):
+            return UNSOLVABLE
+    except core.SolveTimeout:
+        return TIMEOUT
+    return core.format_grid(grid)
+
+
+def solve_chunk(lines, engine=None, with_stats=False, cache_size=0, vectorized=False, timeout=None,
+                split_workers=None):
+    # Top-level so it can be pickled and sent to worker processes. Each worker keeps its own cache
+    # across chunks; cache_size=0 disables it. The timeout applies to each puzzle separately.
+    if vectorized:
+        return solve_lines_vectorized(lines, engine)
+
+    global _cache
+    cache = None
+    if cache_size:
+        if _cache is None or _cache.maxsize != cache_size:
+            _cache = core.SolutionCache(cache_size)
+        cache = _cache
+    return [
+        _run_line(solve_line, line, with_stats, engine, cache=cache, timeout=timeout, split_workers=split_workers)
+        for line in _puzzles(lines)
+    ]
+
+
+def solve_lines_vectorized(lines, engine=None):
+    """
+    Solves a list of puzzle lines (or a CorpusSpan) together with core.solve_many (requires NumPy).
+
+    Returns:
+    - One result per line, exactly as solve_line would give them.
+    """
+    results = [INVALID] * len(lines)
+    grids = []
+    positions = []
+    for position, line in enumerate(_puzzles(lines)):
+        grid = _parse(line)
+        if grid is not None and core.find_duplicates(grid) is None:
+            grids.append(grid)
+            positions.append(position)
+
+    for position, grid, solved in zip(positions, grids, core.solve_many(grids, engine)):
+        results[position] = core.format_grid(grid) if solved else UNSOLVABLE
+    return results
+
+
+def count_line(line, limit=2, engine=None, stats=None):
+    """
+    Counts the solutions of one puzzle given in the text format (see core.parse_grid).
+
+    Args:
+    - line: The puzzle text, or a list of row lists already unpacked from a corpus.
+    - limit: The number of solutions after which counting stops.
+    - engine: The solving engine name, one of core.ENGINES (default: chosen by board size).
+    - stats: Optional SolveStats to collect search statistics into.
+
+    Returns:
+    - The solution count as a string, with a trailing "+" when counting stopped at the limit
+      (so "2+" means "not unique"), or INVALID.
+    """
+    grid = _parse(line)
+    if grid is None or core.find_duplicates(grid) is not None:
+        return INVALID
+    found = core.count_solutions(grid, limit, engine, stats=stats)
+    return f"{found}+" if found >= limit else str(found)
+
+
+def count_chunk(lines, limit=2, engine=None, with_stats=False):
+    # Top-level so it can be pickled and sent to worker processes
+    return [_run_line(count_line, line, with_stats, limit, engine) for line in _puzzles(lines)]
+
+
+def _run_line(func, line, with_stats, *args, **kwargs):
+    # With statistics, the result is followed by a tab and the stats as compact JSON
+    if not with_stats:
+        return func(line, *args, **kwargs)
+    stats = core.SolveStats()
+    result = func(line, *args, stats=stats, **kwargs)
+    return result + "\t" + json.dumps(stats.as_dict(), separators=(",", ":"))
+
+
+def puzzle_seed(seed, index):
+    """
+    Derives the seed for the index-th generated puzzle from the run's base seed.
+
+    Seeds depend only on the base seed and the puzzle's position, never on which worker generates it,
+    so a run can be reproduced with any number of workers.
+    """
+    return f"{seed}:{index}"
+
+
+def generate_chunk(indices, seed, clues=None, difficulty=None, symmetric=True, with_solutions=False):
+    # Top-level so it can be pickled and sent to worker processes
+    lines = []
+    for index in indices:
+        try:
+            puzzle, solution = core.generate_puzzle(puzzle_seed(seed, index), clues, difficulty, symmetric)
+        except core.GenerationError:
+            lines.append(FAILED)
+            continue
+        line = core.format_grid(puzzle)
+        if with_solutions:
+            line += " " + core.format_grid(solution)
+        lines.append(line)
+    return lines
+
+
+def map_chunks(func, chunks, workers=None, ordered=True):
+    """
+    Applies `func` to every chunk on a process pool and yields the results as they become available.
+
+    At most two chunks per worker are queued at any time; the next chunk is only read from `chunks`
+    once an earlier result has been handed back.
+
+    Args:
+    - func: A picklable function taking one chunk.
+    - chunks: An iterable of chunks (any picklable values).
+    - workers: The number of worker processes. 1 runs everything in this process; None uses all cores.
+    - ordered: If True results come back in input order, otherwise as soon as each one is done.
+
+    Yields:
+    - (chunk_number, result) pairs, with chunk numbers counting from 0.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for number, chunk in enumerate(chunks):
+            yield number, func(chunk)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        max_pending = 2 * workers
+        pending = collections.deque() if ordered else set()
+        numbers = {}
+
+        for number, chunk in enumerate(chunks):
+            future = pool.submit(func, chunk)
+            numbers[future] = number
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+
+            # Drain results until there is room for the next chunk
+            while len(pending) >= max_pending:
+                for future in _take_done(pending, ordered):
+                    yield numbers.pop(future), future.result()
+
+        while pending:
+            for future in _take_done(pending, ordered):
+                yield numbers.pop(future), future.result()
+
+
+def _take_done(pending, ordered):
+    # Ordered mode waits for the oldest chunk; unordered mode takes whatever has finished
+    if ordered:
+        return [pending.popleft()]
+    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+    pending.difference_update(done)
+    return done
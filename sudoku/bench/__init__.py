@@ -0,0 +1,6 @@
+"""
+Headless benchmark harness for the solving engines.
+
+The fixed corpora in `corpora/` were generated from fixed seeds (see the header of each file), so
+results from different runs and machines can be compared directly.
+"""
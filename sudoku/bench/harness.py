@@ -0,0 +1,164 @@
+"""
+Runs every engine over the fixed corpora and reports latency, throughput, search nodes and memory.
+
+Timings and node counts come from one set of passes; peak memory is measured in a separate pass
+because tracemalloc slows everything down while it is tracing.
+"""
+
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from sudoku import batch, core
+
+CORPORA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpora")
+
+
+def corpus_names():
+    """
+    Returns the names of the bundled corpora, e.g. ["adversarial", "easy", "hard"].
+    """
+    return sorted(name[:-4] for name in os.listdir(CORPORA_DIR) if name.endswith(".txt"))
+
+
+def load_corpus(name):
+    """
+    Reads a bundled corpus.
+
+    Args:
+    - name: A corpus name from corpus_names().
+
+    Returns:
+    - A list of 81-character puzzle strings.
+    """
+    with open(os.path.join(CORPORA_DIR, name + ".txt"), "r") as source:
+        return list(batch.read_puzzles(source))
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted, non-empty list.
+
+    Args:
+    - sorted_values: The values in ascending order.
+    - fraction: The percentile as a fraction, e.g. 0.95 for p95.
+    """
+    rank = max(1, math.ceil(len(sorted_values) * fraction))
+    return sorted_values[rank - 1]
+
+
+def bench_engine(engine, puzzles, presolve=True, repeat=1):
+    """
+    Benchmarks one engine on a list of puzzles.
+
+    Args:
+    - engine: The engine name, one of core.ENGINES.
+    - puzzles: A list of 81-character puzzle strings.
+    - presolve: Whether to run the logical reduction before searching.
+    - repeat: How many times to solve the whole list for the timing figures.
+
+    Returns:
+    - A dict of results. Latencies are in milliseconds and memory in KiB.
+    """
+    grids = [core.parse_grid(puzzle) for puzzle in puzzles]
+
+    latencies = []
+    stats = core.SolveStats()
+    solved = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for grid in grids:
+            work = [row[:] for row in grid]
+            begin = time.perf_counter()
+            if core.solve(work, engine, presolve=presolve, stats=stats):
+                solved += 1
+            latencies.append((time.perf_counter() - begin) * 1000)
+    elapsed = time.perf_counter() - started
+
+    # Peak memory of a single solve, traced separately so it does not distort the timings
+    peak = 0
+    tracemalloc.start()
+    try:
+        for grid in grids:
+            tracemalloc.reset_peak()
+            core.solve([row[:] for row in grid], engine, presolve=presolve)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    runs = len(latencies)
+    return {
+        "engine": engine,
+        "presolve": presolve,
+        "puzzles": len(grids),
+        "repeat": repeat,
+        "solved": solved // repeat,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 4),
+            "p95": round(percentile(latencies, 0.95), 4),
+            "p99": round(percentile(latencies, 0.99), 4),
+            "max": round(latencies[-1], 4),
+            "mean": round(sum(latencies) / runs, 4),
+        },
+        "puzzles_per_second": round(runs / elapsed, 2) if elapsed > 0 else None,
+        "nodes": {
+            "total": stats.nodes // repeat,
+            "mean": round(stats.nodes / runs, 2),
+        },
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def run(corpora=None, engines=None, presolve=True, repeat=1, progress=None):
+    """
+    Benchmarks every engine on every corpus.
+
+    Args:
+    - corpora: Corpus names to run (default: all bundled corpora).
+    - engines: Engine names to run (default: all of core.ENGINES).
+    - presolve: Whether to run the logical reduction before searching.
+    - repeat: How many times to solve each corpus for the timing figures.
+    - progress: Optional callable receiving each result dict as soon as it is ready.
+
+    Returns:
+    - A JSON-serialisable dict with an "environment" section and a "results" list ordered by corpus
+      and engine, so files from two runs can be diffed line by line.
+    """
+    corpora = sorted(corpora or corpus_names())
+    engines = sorted(engines or core.ENGINES)
+
+    results = []
+    for name in corpora:
+        puzzles = load_corpus(name)
+        for engine in engines:
+            result = dict(corpus=name, **bench_engine(engine, puzzles, presolve, repeat))
+            results.append(result)
+            if progress is not None:
+                progress(result)
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "executable_bits": 64 if sys.maxsize > 2 ** 32 else 32,
+        },
+        "results": results,
+    }
+
+
+def format_result(result):
+    """
+    Formats one result dict as a single human-readable line.
+    """
+    latency = result["latency_ms"]
+    return (
+        f"{result['corpus']:<12} {result['engine']:<10} "
+        f"p50 {latency['p50']:8.3f} ms  p95 {latency['p95']:8.3f} ms  p99 {latency['p99']:8.3f} ms  "
+        f"{result['puzzles_per_second']:9.1f}/s  nodes {result['nodes']['total']:>9}  "
+        f"peak {result['peak_memory_kib']:8.1f} KiB  solved {result['solved']}/{result['puzzles']}"
+    )
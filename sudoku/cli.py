@@ -0,0 +1,395 @@
+"""
+Headless command-line interface.
+
+Usage:
+    python -m sudoku solve puzzles.txt -o solutions.txt
+    cat puzzles.txt | python -m sudoku solve --workers 4 --unordered
+    python -m sudoku count puzzles.txt --limit 2
+    python -m sudoku generate -n 1000 --seed 7 --clues 26 -o fresh.txt
+    python -m sudoku bench --repeat 3 -o results.json
+    python -m sudoku serve --port 8000 --workers 4
+    python -m sudoku pack puzzles.txt -o puzzles.sdkc --meta source=newspaper
+    python -m sudoku solve puzzles.sdkc -o solutions.txt
+    python -m sudoku solve hard25.txt --split --workers 8
+    python -m sudoku unpack puzzles.sdkc --solutions
+"""
+
+import argparse
+import collections
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+
+from sudoku import batch, core
+from sudoku.bench import harness
+from sudoku.core import corpus
+
+
+def open_input(path):
+    # "-" means stdin; the caller must not close it
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin)
+    return open(path, "r")
+
+
+def open_output(path):
+    # "-" means stdout; the caller must not close it
+    if path == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return open(path, "w")
+
+
+def run_batch(args, chunk_func, workers=None):
+    """
+    Streams the input through `chunk_func` on the worker pool, writing one result line per puzzle.
+    `workers` overrides --workers as the size of that pool.
+
+    In ordered mode the output lines match the input lines one to one. With --unordered each output
+    line is prefixed with the 1-based puzzle number and a tab, since results arrive as they finish.
+    A packed corpus (see `pack`) is split into index ranges that the workers read from the file
+    themselves.
+
+    Returns:
+    - A Counter of result line -> number of puzzles that produced it.
+    """
+    tally = collections.Counter()
+    packed = args.input != "-" and corpus.is_corpus(args.input)
+    with open_input(os.devnull if packed else args.input) as source, open_output(args.output) as sink:
+        if packed:
+            chunks = batch.corpus_spans(args.input, args.chunk_size)
+        else:
+            chunks = batch.chunked(batch.read_puzzles(source), args.chunk_size)
+        results = batch.map_chunks(chunk_func, chunks, workers=workers or args.workers, ordered=not args.unordered)
+
+        for number, lines in results:
+            start = number * args.chunk_size
+            for offset, line in enumerate(lines):
+                if args.unordered:
+                    sink.write(f"{start + offset + 1}\t{line}\n")
+                else:
+                    sink.write(line + "\n")
+            # Only tally status lines, which are shorter than any board; counting every distinct
+            # solution would grow without bound
+            statuses = (line.split("\t", 1)[0] for line in lines)
+            tally.update(status for status in statuses if len(status) < 81)
+    return tally
+
+
+def cmd_solve(args):
+    """
+    Solves every puzzle in the input, writing one solution per line.
+    """
+    if args.vectorized:
+        from sudoku.core import vectorized  # Imports NumPy, so only when asked for
+
+        if not vectorized.available():
+            print("--vectorized requires NumPy (pip install numpy)", file=sys.stderr)
+            return 2
+        if args.stats or args.cache_size:
+            print("--vectorized cannot be combined with --stats or --cache-size", file=sys.stderr)
+            return 2
+    if args.split and (args.vectorized or args.cache_size):
+        print("--split cannot be combined with --vectorized or --cache-size", file=sys.stderr)
+        return 2
+
+    # With --split the puzzles are taken one at a time here, and each search is shared out instead
+    solve_chunk = functools.partial(
+        batch.solve_chunk, engine=args.engine, with_stats=args.stats, cache_size=args.cache_size,
+        vectorized=args.vectorized, split_workers=args.workers if args.split else None,
+    )
+    try:
+        tally = run_batch(args, solve_chunk, workers=1 if args.split else None)
+    except corpus.CorpusError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    failures = tally[batch.UNSOLVABLE] + tally[batch.INVALID]
+    if failures:
+        print(f"{failures} puzzle(s) could not be solved", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_count(args):
+    """
+    Counts the solutions of every puzzle in the input, writing one count per line.
+
+    Counting stops at --limit, which is written with a trailing "+". The exit status is 0 only when
+    every puzzle has exactly one solution.
+    """
+    count_chunk = functools.partial(
+        batch.count_chunk, limit=args.limit, engine=args.engine, with_stats=args.stats
+    )
+    try:
+        tally = run_batch(args, count_chunk)
+    except corpus.CorpusError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    summary = ", ".join(f"{result}={count}" for result, count in sorted(tally.items()))
+    print(f"solution counts: {summary}", file=sys.stderr)
+    return 1 if sum(tally.values()) != tally["1"] else 0
+
+
+def cmd_generate(args):
+    """
+    Generates puzzles with unique solutions, one per line, and reports throughput on stderr.
+
+    Puzzle i is always generated from the seed "<seed>:<i>", so a run is reproducible with any
+    number of workers.
+    """
+    generate_chunk = functools.partial(
+        batch.generate_chunk,
+        seed=args.seed,
+        clues=args.clues,
+        difficulty=args.difficulty,
+        symmetric=not args.asymmetric,
+        with_solutions=args.solutions,
+    )
+    chunks = batch.chunked(range(args.count), args.chunk_size)
+
+    started = time.perf_counter()
+    failures = 0
+    with open_output(args.output) as sink:
+        for _, lines in batch.map_chunks(generate_chunk, chunks, workers=args.workers):
+            for line in lines:
+                if line == batch.FAILED:
+                    failures += 1
+                sink.write(line + "\n")
+    elapsed = time.perf_counter() - started
+
+    made = args.count - failures
+    rate = made / elapsed if elapsed > 0 else float("inf")
+    print(f"generated {made} puzzle(s) in {elapsed:.2f}s ({rate:.1f} puzzles/s)", file=sys.stderr)
+    if failures:
+        print(f"{failures} puzzle(s) could not meet the target", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_bench(args):
+    """
+    Benchmarks the engines on the bundled corpora, printing a summary line per run to stderr and
+    writing the full results as JSON.
+    """
+    report = harness.run(
+        corpora=args.corpus,
+        engines=args.engine,
+        presolve=not args.no_presolve,
+        repeat=args.repeat,
+        progress=lambda result: print(harness.format_result(result), file=sys.stderr),
+    )
+    with open_output(args.output) as sink:
+        json.dump(report, sink, indent=2, sort_keys=True)
+        sink.write("\n")
+    return 0
+
+
+def cmd_pack(args):
+    """
+    Packs a text puzzle file (optionally with solutions after each puzzle) into a binary corpus.
+    """
+    metadata = {}
+    for item in args.meta or []:
+        key, separator, value = item.partition("=")
+        if not separator:
+            print(f"--meta expects KEY=VALUE, got {item!r}", file=sys.stderr)
+            return 2
+        metadata[key] = value
+
+    with open_input(args.input) as source:
+        try:
+            count = corpus.pack_text(batch.read_puzzles(source), args.output, metadata)
+        except corpus.CorpusError as error:
+            print(f"cannot pack: {error}", file=sys.stderr)
+            return 1
+    print(f"packed {count} puzzle(s) into {os.path.getsize(args.output)} bytes", file=sys.stderr)
+    return 0
+
+
+def cmd_unpack(args):
+    """
+    Writes the puzzles of a binary corpus as text lines, or its metadata as JSON.
+    """
+    try:
+        if args.metadata:
+            with core.Corpus(args.input) as packed, open_output(args.output) as sink:
+                json.dump(packed.metadata, sink, indent=2, sort_keys=True)
+                sink.write("\n")
+            return 0
+        with open_output(args.output) as sink:
+            for line in corpus.unpack_text(args.input, args.solutions):
+                sink.write(line + "\n")
+    except corpus.CorpusError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_serve(args):
+    """
+    Runs the HTTP/JSON solving service until interrupted.
+    """
+    from sudoku import server  # Only the service needs asyncio and the HTTP code
+
+    server.serve(
+        args.host,
+        args.port,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        batch_wait=args.batch_wait / 1000,
+        queue_size=args.queue_size,
+        timeout=args.timeout,
+        cache_size=args.cache_size,
+        engine=args.engine,
+    )
+    return 0
+
+
+def positive_float(text):
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("must be positive")
+    return value
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return value
+
+
+def non_negative_int(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError("must be at least 0")
+    return value
+
+
+def add_batch_arguments(parser):
+    # Input/output and worker pool options shared by the puzzle-file commands
+    parser.add_argument("input", nargs="?", default="-",
+                        help="puzzle file or packed corpus, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    parser.add_argument("-j", "--workers", type=positive_int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=positive_int, default=256,
+                        help="puzzles sent to a worker at a time (default: 256)")
+    parser.add_argument("--engine", choices=sorted(core.ENGINES), default=None,
+                        help=f"solving engine (default: {core.DEFAULT_ENGINE} on 9x9, "
+                             f"{core.LARGE_BOARD_ENGINE} on larger boards)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="write results as they finish, prefixed with the puzzle number")
+    parser.add_argument("--stats", action="store_true",
+                        help="follow each result with a tab and its search statistics as JSON")
+
+
+def clue_count(text):
+    value = int(text)
+    if not 17 <= value <= 81:
+        raise argparse.ArgumentTypeError("must be between 17 and 81")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m sudoku", description="Headless Sudoku tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="solve a file of puzzles, one per line")
+    add_batch_arguments(solve)
+    solve.add_argument("--cache-size", type=non_negative_int, default=0,
+                       help="solutions each worker caches by symmetry class; 0 disables (default: 0)")
+    solve.add_argument("--vectorized", action="store_true",
+                       help="propagate singles across each chunk at once with NumPy; "
+                            "use a larger --chunk-size for best throughput")
+    solve.add_argument("--split", action="store_true",
+                       help="search each puzzle on all the workers at once instead of giving each "
+                            "worker its own puzzles; for a few very hard puzzles")
+    solve.set_defaults(func=cmd_solve)
+
+    count = commands.add_parser("count", help="count solutions (uniqueness check) for a file of puzzles")
+    add_batch_arguments(count)
+    count.add_argument("--limit", type=positive_int, default=2,
+                       help="stop counting each puzzle at this many solutions (default: 2)")
+    count.set_defaults(func=cmd_count)
+
+    generate = commands.add_parser("generate", help="generate puzzles with unique solutions")
+    generate.add_argument("-n", "--count", type=positive_int, default=1,
+                          help="number of puzzles (default: 1)")
+    generate.add_argument("--seed", default="0",
+                          help="base seed; the same seed gives the same puzzles (default: 0)")
+    generate.add_argument("--clues", type=clue_count, default=None,
+                          help="target number of givens, 17-81 (default: remove as many as possible)")
+    generate.add_argument("--difficulty", choices=core.DIFFICULTIES, default=None,
+                          help="target difficulty rating")
+    generate.add_argument("--asymmetric", action="store_true",
+                          help="remove clues in random order instead of symmetric pairs")
+    generate.add_argument("--solutions", action="store_true",
+                          help="append each solution after a space")
+    generate.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    generate.add_argument("-j", "--workers", type=positive_int, default=os.cpu_count() or 1,
+                          help="number of worker processes (default: all cores)")
+    generate.add_argument("--chunk-size", type=positive_int, default=16,
+                          help="puzzles generated by a worker at a time (default: 16)")
+    generate.set_defaults(func=cmd_generate)
+
+    bench = commands.add_parser("bench", help="benchmark the engines on the bundled corpora")
+    bench.add_argument("--corpus", action="append", choices=harness.corpus_names(),
+                       help="corpus to run; repeat for several (default: all)")
+    bench.add_argument("--engine", action="append", choices=sorted(core.ENGINES),
+                       help="engine to run; repeat for several (default: all)")
+    bench.add_argument("--repeat", type=positive_int, default=1,
+                       help="times to solve each corpus for the timings (default: 1)")
+    bench.add_argument("--no-presolve", action="store_true",
+                       help="skip the logical reduction and time the search alone")
+    bench.add_argument("-o", "--output", default="-", help="JSON results file, or - for stdout (default)")
+    bench.set_defaults(func=cmd_bench)
+
+    pack = commands.add_parser("pack", help="pack a text puzzle file into a binary corpus")
+    pack.add_argument("input", nargs="?", default="-",
+                      help="puzzle file, one puzzle per line optionally followed by its solution, "
+                           "or - for stdin (default)")
+    pack.add_argument("-o", "--output", required=True, help="corpus file to write")
+    pack.add_argument("--meta", action="append", metavar="KEY=VALUE",
+                      help="metadata to store with the corpus; repeat for several")
+    pack.set_defaults(func=cmd_pack)
+
+    unpack = commands.add_parser("unpack", help="write the puzzles of a binary corpus as text")
+    unpack.add_argument("input", help="corpus file")
+    unpack.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    unpack.add_argument("--solutions", action="store_true",
+                        help="append each stored solution after a space")
+    unpack.add_argument("--metadata", action="store_true", help="write the corpus metadata as JSON instead")
+    unpack.set_defaults(func=cmd_unpack)
+
+    serve = commands.add_parser("serve", help="serve the solver over HTTP/JSON on localhost")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    serve.add_argument("-j", "--workers", type=positive_int, default=os.cpu_count() or 1,
+                       help="number of worker processes (default: all cores)")
+    serve.add_argument("--batch-size", type=positive_int, default=64,
+                       help="most puzzles sent to a worker at a time (default: 64)")
+    serve.add_argument("--batch-wait", type=float, default=2.0,
+                       help="milliseconds to wait for more puzzles before sending a batch (default: 2)")
+    serve.add_argument("--queue-size", type=positive_int, default=10000,
+                       help="most puzzles waiting for a worker before requests are refused (default: 10000)")
+    serve.add_argument("--timeout", type=positive_float, default=10.0,
+                       help="longest a request may take and each puzzle's search budget, in seconds "
+                            "(default: 10)")
+    serve.add_argument("--cache-size", type=non_negative_int, default=1000,
+                       help="solutions each worker caches by symmetry class; 0 disables (default: 1000)")
+    serve.add_argument("--engine", choices=sorted(core.ENGINES), default=None,
+                       help=f"solving engine (default: {core.DEFAULT_ENGINE} on 9x9, "
+                            f"{core.LARGE_BOARD_ENGINE} on larger boards)")
+    serve.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,59 @@
+"""
+Qt-free Sudoku core: solving, duplicate checking and grid parsing for 9x9, 16x16 and 25x25 boards.
+
+Submodules are imported lazily on first attribute access, so `import sudoku.core` itself only costs
+a few milliseconds.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "solve": "solver",
+    "count_solutions": "solver",
+    "solve_parallel": "parallel",
+    "count_solutions_parallel": "parallel",
+    "ENGINES": "solver",
+    "DEFAULT_ENGINE": "solver",
+    "LARGE_BOARD_ENGINE": "solver",
+    "BitmaskSearch": "engine",
+    "DancingLinks": "dlx",
+    "SolutionCache": "cache",
+    "Corpus": "corpus",
+    "CorpusWriter": "corpus",
+    "CorpusError": "corpus",
+    "canonical_form": "cache",
+    "CancelToken": "cancel",
+    "SolveCancelled": "cancel",
+    "SolveTimeout": "cancel",
+    "SolveStats": "stats",
+    "SolveObserver": "stats",
+    "find_duplicates": "validate",
+    "ConflictIndex": "conflicts",
+    "solve_many": "vectorized",
+    "reduce_candidates": "logic",
+    "DIFFICULTIES": "generate",
+    "generate_puzzle": "generate",
+    "GenerationError": "generate",
+    "Board": "board",
+    "Geometry": "geometry",
+    "SYMBOLS": "grid",
+    "GridError": "grid",
+    "parse_grid": "grid",
+    "format_grid": "grid",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
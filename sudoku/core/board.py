@@ -0,0 +1,115 @@
+"""
+A compact board of any box size, stored as a flat bytearray.
+
+Everything in the core accepts either a Board or the classic list of row lists; the helpers at the
+bottom convert between the two so each engine only ever sees a flat, row-major list of cells.
+"""
+
+from sudoku.core import geometry as _geometry
+from sudoku.core import grid as _grid
+
+
+class Board(object):
+    """
+    A square Sudoku board with one byte per cell, row-major, 0 for empty.
+
+    Args:
+    - box: The box size (3 for 9x9, 4 for 16x16, 5 for 25x25).
+    - cells: Optional initial values; the board starts empty without them.
+
+    Raises:
+    - ValueError: If the box size is unsupported or `cells` has the wrong length.
+    """
+
+    __slots__ = ("geometry", "cells")
+
+    def __init__(self, box=3, cells=None):
+        self.geometry = _geometry.geometry(box)
+        if cells is None:
+            self.cells = bytearray(self.geometry.cell_count)
+        else:
+            self.cells = bytearray(cells)
+            if len(self.cells) != self.geometry.cell_count:
+                raise ValueError(f"expected {self.geometry.cell_count} cells, got {len(self.cells)}")
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds a board from a list of row lists.
+        """
+        return cls(_geometry.for_size(len(rows)).box, [value for row in rows for value in row])
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parses the text format (see grid.parse_grid), inferring the board size from its length.
+
+        Raises:
+        - GridError: If the text is not a valid board.
+        """
+        return cls.from_rows(_grid.parse_grid(text))
+
+    @property
+    def box(self):
+        return self.geometry.box
+
+    @property
+    def size(self):
+        return self.geometry.size
+
+    def __getitem__(self, position):
+        row, col = position
+        return self.cells[row * self.geometry.size + col]
+
+    def __setitem__(self, position, value):
+        row, col = position
+        self.cells[row * self.geometry.size + col] = value
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.cells == other.cells
+
+    def __repr__(self):
+        return f"Board.parse({str(self)!r})"
+
+    def __str__(self):
+        return _grid.format_grid(self.to_rows())
+
+    def copy(self):
+        return Board(self.geometry.box, self.cells)
+
+    def to_rows(self):
+        """
+        Returns the board as a new list of row lists.
+        """
+        size = self.geometry.size
+        return [list(self.cells[row * size:row * size + size]) for row in range(size)]
+
+
+def cells_of(grid):
+    """
+    Returns the cells of a Board or list of row lists as a new flat, row-major list.
+    """
+    if isinstance(grid, Board):
+        return list(grid.cells)
+    return [value for row in grid for value in row]
+
+
+def assign(grid, cells):
+    """
+    Writes a flat, row-major list of cells back into a Board or list of row lists.
+    """
+    if isinstance(grid, Board):
+        grid.cells[:] = bytes(cells)
+        return
+    size = len(grid)
+    for row in range(size):
+        grid[row][:] = cells[row * size:row * size + size]
+
+
+def copy_of(grid):
+    """
+    Returns an independent copy of a Board or list of row lists.
+    """
+    if isinstance(grid, Board):
+        return grid.copy()
+    return [row[:] for row in grid]
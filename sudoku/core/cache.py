@@ -0,0 +1,323 @@
+"""
+Solution cache keyed by Sudoku symmetry class.
+
+Two puzzles are equivalent when one can be turned into the other by relabelling digits, permuting
+rows within a band, permuting the bands, doing the same for columns and stacks, and transposing.
+Each puzzle is reduced to a canonical form (the same string for every puzzle in the class), so a
+solution stored for one puzzle answers all of its equivalents after being mapped back.
+
+The canonical form is the lexicographically smallest relabelled string over the transformations
+that sort the rows, columns, bands and stacks by clue-pattern invariants. Because those invariants
+are unchanged by every symmetry, equivalent puzzles always give the same set of candidate strings.
+Puzzles whose invariants leave too many ties (almost-full grids) are simply not cached.
+"""
+
+import collections
+import itertools
+import math
+import os
+
+from sudoku.core import board, solver
+from sudoku.core.stats import SolveStats
+
+MAX_TRANSFORMS = 2000  # Candidate transformations to try before giving up on canonicalising a grid
+
+
+class CanonicalForm(object):
+    """
+    The canonical key of a grid plus the transformation that produced it.
+
+    Attributes:
+    - key: The canonical puzzle as an 81-character string.
+    - transpose: Whether the grid was transposed first.
+    - rows, cols: Source row/column (after any transpose) for each canonical row/column.
+    - labels: Original digit -> canonical digit for all nine digits.
+    """
+
+    def __init__(self, key, transpose, rows, cols, labels):
+        self.key = key
+        self.transpose = transpose
+        self.rows = rows
+        self.cols = cols
+        self.labels = labels
+
+    def to_canonical(self, cells):
+        # Apply the same transformation to another flat grid, e.g. the puzzle's solution
+        oriented = _transposed(cells) if self.transpose else cells
+        labels = self.labels
+        return "".join(
+            str(labels[oriented[self.rows[r] * 9 + self.cols[c]]]) for r in range(9) for c in range(9)
+        )
+
+    def from_canonical(self, text):
+        # Undo the transformation, returning a flat grid in the original orientation and labels
+        digits = {canonical: original for original, canonical in self.labels.items()}
+        oriented = [0] * 81
+        for r in range(9):
+            for c in range(9):
+                oriented[self.rows[r] * 9 + self.cols[c]] = digits[int(text[r * 9 + c])]
+        return _transposed(oriented) if self.transpose else oriented
+
+
+def _transposed(cells):
+    return [cells[c * 9 + r] for r in range(9) for c in range(9)]
+
+
+def _line_keys(cells):
+    # Invariant keys per row and per column: the clue count plus the multiset of clue counts of the
+    # crossing lines at each clue. Row and column permutations only reorder these keys.
+    row_counts = [sum(1 for c in range(9) if cells[r * 9 + c]) for r in range(9)]
+    col_counts = [sum(1 for r in range(9) if cells[r * 9 + c]) for c in range(9)]
+    row_keys = [
+        (row_counts[r], tuple(sorted(col_counts[c] for c in range(9) if cells[r * 9 + c])))
+        for r in range(9)
+    ]
+    col_keys = [
+        (col_counts[c], tuple(sorted(row_counts[r] for r in range(9) if cells[r * 9 + c])))
+        for c in range(9)
+    ]
+    return row_keys, col_keys
+
+
+def _tie_groups(indices, key):
+    # Sort descending by key and split into runs of equal keys
+    ordered = sorted(indices, key=key, reverse=True)
+    return [list(group) for _, group in itertools.groupby(ordered, key=key)]
+
+
+def _orderings(keys):
+    """
+    Finds every band/line ordering that sorts the lines into their canonical order.
+
+    Returns:
+    - (signature, count, generator): the sorted keys (identical for equivalent grids), the number of
+      orderings, and a generator of orderings as lists of source line indices.
+    """
+    band_lines = []
+    band_keys = []
+    for band in range(3):
+        lines = _tie_groups(range(band * 3, band * 3 + 3), lambda i: keys[i])
+        band_lines.append(lines)
+        band_keys.append(tuple(keys[group[0]] for group in lines for _ in group))
+
+    band_groups = _tie_groups(range(3), lambda b: band_keys[b])
+    signature = tuple(band_keys[group[0]] for group in band_groups for _ in group)
+
+    count = 1
+    for group in band_groups:
+        count *= math.factorial(len(group))
+    for lines in band_lines:
+        for group in lines:
+            count *= math.factorial(len(group))
+
+    def generate():
+        band_choices = itertools.product(*(itertools.permutations(group) for group in band_groups))
+        for band_choice in band_choices:
+            bands = [band for group in band_choice for band in group]
+            line_choices = [
+                [
+                    [line for group in choice for line in group]
+                    for choice in itertools.product(*(itertools.permutations(g) for g in band_lines[band]))
+                ]
+                for band in bands
+            ]
+            for choice in itertools.product(*line_choices):
+                yield [line for lines in choice for line in lines]
+
+    return signature, count, generate
+
+
+def canonical_form(cells, max_transforms=MAX_TRANSFORMS):
+    """
+    Reduces a grid to its canonical form.
+
+    Args:
+    - cells: A flat, row-major list of values (0 for empty).
+    - max_transforms: Give up if more than this many transformations would have to be compared.
+
+    Returns:
+    - A CanonicalForm, or None if the grid is not 9x9 or has too many symmetric ties to canonicalise
+      cheaply.
+    """
+    if len(cells) != 81:
+        return None
+
+    # Only the orientations with the largest invariant signature are candidates
+    orientations = []
+    for transpose in (False, True):
+        oriented = _transposed(cells) if transpose else cells
+        row_keys, col_keys = _line_keys(oriented)
+        row_signature, row_count, row_orderings = _orderings(row_keys)
+        col_signature, col_count, col_orderings = _orderings(col_keys)
+        orientations.append((
+            (row_signature, col_signature), transpose, oriented, row_count * col_count, row_orderings, col_orderings
+        ))
+    best_signature = max(orientation[0] for orientation in orientations)
+    orientations = [orientation for orientation in orientations if orientation[0] == best_signature]
+    if sum(orientation[3] for orientation in orientations) > max_transforms:
+        return None
+
+    best = None
+    for _, transpose, oriented, _, row_orderings, col_orderings in orientations:
+        col_list = list(col_orderings())
+        for rows in row_orderings():
+            for cols in col_list:
+                candidate = _relabelled(oriented, rows, cols, best[0] if best else None)
+                if candidate is not None:
+                    best = (candidate, transpose, rows, cols)
+
+    values, transpose, rows, cols = best
+    oriented = _transposed(cells) if transpose else cells
+
+    # Labels follow first appearance; a digit missing from the puzzle gets the next free label
+    labels = {}
+    for r in range(9):
+        for c in range(9):
+            value = oriented[rows[r] * 9 + cols[c]]
+            if value and value not in labels:
+                labels[value] = len(labels) + 1
+    for digit in range(1, 10):
+        if digit not in labels:
+            labels[digit] = len(labels) + 1
+
+    return CanonicalForm("".join(map(str, values)), transpose, rows, cols, labels)
+
+
+def _relabelled(oriented, rows, cols, bound):
+    # The transformed, relabelled cells, or None as soon as they compare greater than or equal to bound
+    labels = {}
+    values = []
+    tied = bound is not None
+    for r in range(9):
+        base = rows[r] * 9
+        for c in range(9):
+            value = oriented[base + cols[c]]
+            if value:
+                label = labels.get(value)
+                if label is None:
+                    label = labels[value] = len(labels) + 1
+                value = label
+            if tied:
+                other = bound[len(values)]
+                if value > other:
+                    return None
+                if value < other:
+                    tied = False
+            values.append(value)
+    return None if tied else values
+
+
+class SolutionCache(object):
+    """
+    A bounded LRU cache of solutions keyed by canonical form.
+
+    Only puzzles with exactly one solution are stored, since every equivalent puzzle then has a single
+    answer too and the mapped-back solution is exactly what a fresh solve would return.
+
+    Args:
+    - maxsize: The number of symmetry classes to keep; the least recently used is evicted first.
+    - path: Optional file to load from now and save to with save(). One "puzzle solution" pair of
+      canonical strings per line.
+
+    Raises:
+    - ValueError: If maxsize is negative.
+    """
+
+    def __init__(self, maxsize=10000, path=None):
+        if maxsize < 0:
+            raise ValueError(f"maxsize must be at least 0, got {maxsize}")
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, grid):
+        """
+        Looks up the solution of a grid without solving it.
+
+        Args:
+        - grid: A Board or list of row lists with 0 for empty cells. Only 9x9 grids are ever cached.
+
+        Returns:
+        - The solved grid as a new 9x9 list of lists, or None on a miss.
+        """
+        return self._lookup(canonical_form(board.cells_of(grid)))
+
+    def _lookup(self, form):
+        solution = self.entries.get(form.key) if form is not None else None
+        if solution is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(form.key)
+        self.hits += 1
+        cells = form.from_canonical(solution)
+        return [cells[row * 9:row * 9 + 9] for row in range(9)]
+
+    def store(self, grid, solution):
+        """
+        Stores the solution of a uniquely solvable grid.
+
+        Args:
+        - grid: The puzzle as a Board or list of row lists with 0 for empty cells.
+        - solution: Its only solution, in the same form.
+        """
+        self._store(canonical_form(board.cells_of(grid)), solution)
+
+    def _store(self, form, solution):
+        if form is None:
+            return
+        self.entries[form.key] = form.to_canonical(board.cells_of(solution))
+        self.entries.move_to_end(form.key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def solve(self, grid, engine=None, token=None, presolve=True, stats=None):
+        """
+        Solves a grid in place, answering from the cache when an equivalent puzzle was solved before.
+
+        Takes the same arguments and returns the same result as core.solve. On a hit no search runs,
+        so `stats` is left untouched.
+        """
+        form = canonical_form(board.cells_of(grid))
+        solution = self._lookup(form)
+        if solution is not None:
+            board.assign(grid, [value for row in solution for value in row])
+            return True
+
+        stats = stats if stats is not None else SolveStats()
+        solutions_before = stats.solutions
+        solved = solver.solve(grid, engine, token, presolve, stats)
+        if solved and stats.solutions - solutions_before == 1:
+            self._store(form, grid)
+        return solved
+
+    def load(self, path=None):
+        """
+        Adds the entries saved in a cache file, keeping at most `maxsize` of them.
+        """
+        with open(path or self.path, "r") as source:
+            for line in source:
+                parts = line.split()
+                if len(parts) == 2 and len(parts[0]) == 81 and len(parts[1]) == 81:
+                    self.entries[parts[0]] = parts[1]
+                    self.entries.move_to_end(parts[0])
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def save(self, path=None):
+        """
+        Writes the cache to a file, least recently used first, replacing the file atomically.
+        """
+        path = path or self.path
+        temporary = path + ".tmp"
+        with open(temporary, "w") as sink:
+            for key, solution in self.entries.items():
+                sink.write(f"{key} {solution}\n")
+        os.replace(temporary, path)
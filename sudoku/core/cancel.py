@@ -0,0 +1,45 @@
+"""
+Cooperative cancellation and time budgets for long-running searches.
+
+Engines accept an optional CancelToken and call its check() method every CHECK_INTERVAL nodes, so a
+search can be stopped from another thread or after a deadline without killing the thread.
+"""
+
+import time
+
+CHECK_INTERVAL = 1024  # Search nodes between token checks
+
+
+class SolveCancelled(Exception):
+    """Raised inside a search when its token has been cancelled."""
+
+
+class SolveTimeout(SolveCancelled):
+    """Raised inside a search when its token's time budget has run out."""
+
+
+class CancelToken(object):
+    """
+    Shared flag telling a running search to stop.
+
+    Args:
+    - timeout: Optional time budget in seconds, counted from when the token is created.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.cancelled = False
+
+    def cancel(self):
+        # Safe to call from any thread; the search notices at its next check
+        self.cancelled = True
+
+    def check(self):
+        """
+        Raises SolveCancelled if the token was cancelled, or SolveTimeout if the deadline has passed.
+        """
+        if self.cancelled:
+            raise SolveCancelled("solve cancelled")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SolveTimeout(f"no solution within {self.timeout:g} seconds")
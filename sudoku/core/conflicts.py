@@ -0,0 +1,137 @@
+"""
+Live duplicate and candidate tracking for a board that is edited one cell at a time.
+
+For every unit and digit the index keeps the set of cells holding that digit, and for every unit a
+mask of the digits present. Changing one cell touches only its three units, so an edit costs the
+same whatever the size of the board, and the conflicting cells and the candidates of every empty
+cell are always up to date without rescanning the grid.
+"""
+
+from sudoku.core import board, geometry
+
+
+class ConflictIndex(object):
+    """
+    Per-unit digit counters for a board of any box size.
+
+    Args:
+    - box: The box size (3 for 9x9).
+    - cells: Optional initial values as a flat, row-major list (0 for empty).
+
+    Attributes:
+    - cells: The current values, flat and row-major.
+    - conflicts: The cells whose digit is repeated in their row, column or box.
+    """
+
+    def __init__(self, box=3, cells=None):
+        self.geometry = geometry.geometry(box)
+        shape = self.geometry
+        size = shape.size
+        self.cells = [0] * shape.cell_count
+        self.conflicts = set()
+
+        # Units are numbered rows, then columns, then boxes, as in geometry.units
+        self.units_of = [
+            (shape.row_of[cell], size + shape.col_of[cell], 2 * size + shape.box_of[cell])
+            for cell in range(shape.cell_count)
+        ]
+        self.places = [[set() for _ in range(size)] for _ in shape.units]
+        self.used = [0] * len(shape.units)
+
+        if cells is not None:
+            self.load(cells)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Builds an index for a Board or list of row lists.
+        """
+        cells = board.cells_of(grid)
+        return cls(geometry.for_cells(len(cells)).box, cells)
+
+    def load(self, cells):
+        """
+        Replaces every value, returning the cells whose conflict status changed.
+        """
+        changed = set()
+        for cell, value in enumerate(cells):
+            changed ^= self.set(cell, value)
+        return changed
+
+    def set(self, cell, value):
+        """
+        Changes one cell (0 to empty it).
+
+        Returns:
+        - The set of cells that started or stopped conflicting because of this edit.
+        """
+        old = self.cells[cell]
+        if old == value:
+            return set()
+        self.cells[cell] = value
+
+        # A unit's other holders of a digit can only change status when its count crosses 1 <-> 2
+        touched = {cell}
+        for unit in self.units_of[cell]:
+            if old:
+                places = self.places[unit][old - 1]
+                places.discard(cell)
+                if not places:
+                    self.used[unit] &= ~(1 << (old - 1))
+                elif len(places) == 1:
+                    touched.update(places)
+            if value:
+                places = self.places[unit][value - 1]
+                places.add(cell)
+                self.used[unit] |= 1 << (value - 1)
+                if len(places) == 2:
+                    touched.update(places)
+
+        changed = set()
+        for other in touched:
+            conflicting = self.is_conflicting(other)
+            if conflicting != (other in self.conflicts):
+                if conflicting:
+                    self.conflicts.add(other)
+                else:
+                    self.conflicts.discard(other)
+                changed.add(other)
+        return changed
+
+    def is_conflicting(self, cell):
+        value = self.cells[cell]
+        if not value:
+            return False
+        return any(len(self.places[unit][value - 1]) > 1 for unit in self.units_of[cell])
+
+    def candidates(self, cell):
+        """
+        Returns the mask of digits not yet used in the cell's row, column or box (bit d means digit d + 1).
+        """
+        row, col, box = self.units_of[cell]
+        return self.geometry.all_digits & ~(self.used[row] | self.used[col] | self.used[box])
+
+    def candidate_masks(self):
+        """
+        Returns per-cell candidate masks for the solver: the own digit for filled cells, the digits
+        unused by any peer for empty ones. Only meaningful when there are no conflicts.
+        """
+        return [1 << (value - 1) if value else self.candidates(cell) for cell, value in enumerate(self.cells)]
+
+    def duplicate(self):
+        """
+        Reports one repeated digit, in the same form as core.find_duplicates.
+
+        Returns:
+        - None if nothing conflicts, otherwise a (unit, index) tuple where unit is "row", "column" or
+          "box", taken from the first conflicting cell in reading order.
+        """
+        if not self.conflicts:
+            return None
+        cell = min(self.conflicts)
+        value = self.cells[cell]
+        size = self.geometry.size
+        for name, unit in zip(("row", "column", "box"), self.units_of[cell]):
+            if len(self.places[unit][value - 1]) > 1:
+                return (name, unit % size)
+        return None
@@ -0,0 +1,395 @@
+"""
+Packed binary puzzle corpora, read through mmap.
+
+A corpus file holds any number of puzzles of any supported sizes, each optionally with its solution,
+plus a JSON object of metadata for the whole file. Cells are packed at 4 bits each on 9x9 boards and
+5 bits on 16x16 and 25x25 ones, so a 9x9 puzzle takes 43 bytes instead of an 82-byte text line.
+
+Layout (all integers little-endian):
+- Header, 32 bytes: magic b"SDKC", version (u16), two reserved bytes, puzzle count (u64), offset of
+  the index (u64), offset of the metadata (u64).
+- Records, one per puzzle: box size (u8), flags (u8, bit 0 set when a solution follows), the packed
+  puzzle, then the packed solution if there is one.
+- Index: count + 1 record offsets (u64); record i spans offsets i to i + 1.
+- Metadata: UTF-8 JSON up to the end of the file.
+
+Readers map the file and slice records straight out of the mapping, so opening a corpus costs the
+same whatever its size, and worker processes that open the same file share its pages.
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from sudoku.core import board, geometry, grid
+
+MAGIC = b"SDKC"
+VERSION = 1
+_HEADER = struct.Struct("<4sH2xQQQ")
+_OFFSET = struct.Struct("<Q")
+_HAS_SOLUTION = 1
+
+# Byte -> low / high nibble, for unpacking 9x9 boards with bytes.translate
+_LOW_NIBBLE = bytes(byte & 15 for byte in range(256))
+_HIGH_NIBBLE = bytes(byte >> 4 for byte in range(256))
+
+
+class CorpusError(ValueError):
+    """Raised when a file is not a valid corpus, or a puzzle cannot be stored in one."""
+
+
+def bits_per_cell(box):
+    # Enough bits for the values 0..size
+    return (box * box).bit_length()
+
+
+def packed_size(box):
+    """
+    Returns the number of bytes one packed board of the given box size takes.
+    """
+    return (geometry.geometry(box).cell_count * bits_per_cell(box) + 7) // 8
+
+
+def pack_cells(cells, box):
+    """
+    Packs a flat, row-major list of values (0 for empty) into bytes, first cell in the lowest bits.
+    """
+    if box == 3:
+        # Two cells per byte; the last byte has an empty high nibble
+        padded = list(cells) + [0]
+        return bytes(padded[i] | padded[i + 1] << 4 for i in range(0, len(cells), 2))
+    bits = bits_per_cell(box)
+    value = 0
+    for cell in reversed(cells):
+        value = value << bits | cell
+    return value.to_bytes(packed_size(box), "little")
+
+
+def unpack_cells(data, box):
+    """
+    Unpacks bytes (or a memoryview) made by pack_cells back into a flat list of values.
+
+    Raises:
+    - CorpusError: If a cell holds a value larger than the board size.
+    """
+    shape = geometry.geometry(box)
+    if box == 3:
+        data = bytes(data)
+        cells = bytearray(2 * len(data))
+        cells[0::2] = data.translate(_LOW_NIBBLE)
+        cells[1::2] = data.translate(_HIGH_NIBBLE)
+        cells = list(cells[:shape.cell_count])
+    else:
+        bits = bits_per_cell(box)
+        mask = (1 << bits) - 1
+        value = int.from_bytes(data, "little")
+        cells = [value >> (bits * i) & mask for i in range(shape.cell_count)]
+    if max(cells) > shape.size:
+        raise CorpusError(f"packed board has a cell value out of range for a {shape.size}x{shape.size} board")
+    return cells
+
+
+class CorpusWriter(object):
+    """
+    Writes a corpus file. Use as a context manager, or call close() to finish the file.
+
+    The file is written under a temporary name and moved into place by close(), so readers never see
+    a half-written corpus.
+
+    Args:
+    - path: The corpus file to create.
+    - metadata: Optional JSON-serialisable dict stored with the corpus.
+    """
+
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self.temporary = path + ".tmp"
+        self.sink = open(self.temporary, "wb")
+        self.sink.write(_HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self.offsets = [_HEADER.size]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, kind, error, traceback):
+        if kind is None:
+            self.close()
+        else:
+            self.sink.close()
+            os.remove(self.temporary)
+
+    def add(self, puzzle, solution=None):
+        """
+        Appends a puzzle.
+
+        Args:
+        - puzzle: A Board, a list of row lists or a puzzle in the text format.
+        - solution: Its solution in any of the same forms, or None.
+
+        Raises:
+        - CorpusError: If the board size is unsupported or the solution does not match the puzzle's size.
+        """
+        cells = _cells(puzzle)
+        box = geometry.for_cells(len(cells)).box
+        record = [bytes((box, _HAS_SOLUTION if solution is not None else 0)), pack_cells(cells, box)]
+        if solution is not None:
+            solution_cells = _cells(solution)
+            if len(solution_cells) != len(cells):
+                raise CorpusError("the solution is not the same size as the puzzle")
+            record.append(pack_cells(solution_cells, box))
+        record = b"".join(record)
+        self.sink.write(record)
+        self.offsets.append(self.offsets[-1] + len(record))
+
+    def close(self):
+        index_offset = self.offsets[-1]
+        for offset in self.offsets:
+            self.sink.write(_OFFSET.pack(offset))
+        metadata_offset = index_offset + _OFFSET.size * len(self.offsets)
+        self.sink.write(json.dumps(self.metadata, sort_keys=True).encode("utf-8"))
+        self.sink.seek(0)
+        self.sink.write(_HEADER.pack(MAGIC, VERSION, len(self), index_offset, metadata_offset))
+        self.sink.close()
+        os.replace(self.temporary, self.path)
+
+
+def _cells(puzzle):
+    # A flat list of values from any of the accepted puzzle forms
+    try:
+        if isinstance(puzzle, str):
+            puzzle = grid.parse_grid(puzzle)
+        cells = board.cells_of(puzzle)
+        geometry.for_cells(len(cells))
+    except ValueError as error:  # GridError is a ValueError too
+        raise CorpusError(str(error)) from None
+    return cells
+
+
+class Corpus(object):
+    """
+    Read-only, memory-mapped access to a corpus file.
+
+    Records are located through the index and unpacked only when asked for; record() hands out the
+    raw bytes as a memoryview into the mapping, without copying. Close the corpus (or use it as a
+    context manager) once no such views are left.
+
+    Args:
+    - path: The corpus file.
+
+    Raises:
+    - CorpusError: If the file is not a corpus.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as source:
+            try:
+                self.map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # An empty file cannot be mapped
+                raise CorpusError(f"{path} is not a puzzle corpus") from None
+        if len(self.map) < _HEADER.size:
+            self.map.close()
+            raise CorpusError(f"{path} is not a puzzle corpus")
+        magic, version, self.count, self.index_offset, self.metadata_offset = _HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise CorpusError(f"{path} is not a version {VERSION} puzzle corpus")
+        index_end = self.index_offset + _OFFSET.size * (self.count + 1)
+        if not (_HEADER.size <= self.index_offset and index_end <= self.metadata_offset <= len(self.map)):
+            self.map.close()
+            raise CorpusError(f"{path} is truncated or corrupt")
+        self.view = memoryview(self.map)
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, kind, error, traceback):
+        self.close()
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+
+    @property
+    def metadata(self):
+        """
+        The JSON metadata stored with the corpus, as a dict.
+
+        Raises:
+        - CorpusError: If the metadata is not valid UTF-8 JSON.
+        """
+        try:
+            return json.loads(bytes(self.view[self.metadata_offset:]).decode("utf-8"))
+        except ValueError:  # UnicodeDecodeError and JSONDecodeError are both ValueErrors
+            raise CorpusError(f"{self.path} has corrupt metadata") from None
+
+    def record(self, index):
+        """
+        Returns record `index` (box size, flags, packed puzzle and solution) as a memoryview into the file.
+
+        Raises:
+        - IndexError: If there is no such record.
+        - CorpusError: If the index points outside the records.
+        """
+        if not 0 <= index < self.count:
+            raise IndexError(f"index {index} out of range for a corpus of {self.count} puzzles")
+        start, end = struct.unpack_from("<2Q", self.map, self.index_offset + _OFFSET.size * index)
+        if not (_HEADER.size <= start and start + 2 <= end <= self.index_offset):
+            raise CorpusError(f"record {index} of {self.path} is corrupt")
+        return self.view[start:end]
+
+    def box(self, index):
+        return self.record(index)[0]
+
+    def has_solution(self, index):
+        return bool(self.record(index)[1] & _HAS_SOLUTION)
+
+    def cells(self, index):
+        """
+        Returns puzzle `index` as a flat, row-major list of values (0 for empty).
+        """
+        return self._unpack(index, 0)
+
+    def solution_cells(self, index):
+        """
+        Returns the stored solution of puzzle `index` as a flat list, or None if it has none.
+        """
+        if not self.has_solution(index):
+            return None
+        return self._unpack(index, 1)
+
+    def _unpack(self, index, board_number):
+        # Board 0 of a record is the puzzle, board 1 the solution. The views are released before any
+        # error propagates (the board is copied out, so no slice of the mapping is left in a
+        # traceback), so the corpus can still be closed
+        with self.record(index) as record:
+            box = record[0]
+            try:
+                size = packed_size(box)
+            except ValueError:
+                raise CorpusError(f"record {index} of {self.path} has an unsupported box size {box}") from None
+            start = 2 + board_number * size
+            if len(record) < start + size:
+                raise CorpusError(f"record {index} of {self.path} is truncated")
+            try:
+                return unpack_cells(bytes(record[start:start + size]), box)
+            except CorpusError:
+                raise CorpusError(f"record {index} of {self.path} has a cell value out of range") from None
+
+    def grid(self, index):
+        """
+        Returns puzzle `index` as a new list of row lists.
+        """
+        return _rows(self.cells(index))
+
+    def solution(self, index):
+        """
+        Returns the stored solution of puzzle `index` as a list of row lists, or None.
+        """
+        cells = self.solution_cells(index)
+        return _rows(cells) if cells is not None else None
+
+    def text(self, index):
+        """
+        Returns puzzle `index` in the text format.
+        """
+        return grid.format_grid(self.grid(index))
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.grid(index)
+
+
+def _rows(cells):
+    size = geometry.for_cells(len(cells)).size
+    return [cells[row * size:row * size + size] for row in range(size)]
+
+
+def is_corpus(path):
+    """
+    Returns True if the file starts like a corpus (it may still be truncated).
+    """
+    try:
+        with open(path, "rb") as source:
+            return source.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def pack_text(lines, path, metadata=None):
+    """
+    Packs text-format lines into a corpus file.
+
+    Args:
+    - lines: Puzzle lines, each optionally followed by whitespace and its solution (as written by
+      `python -m sudoku generate --solutions`).
+    - path: The corpus file to create.
+    - metadata: Optional dict stored with the corpus.
+
+    Returns:
+    - The number of puzzles written.
+
+    Raises:
+    - CorpusError: If a line is not a valid puzzle; the message gives its 1-based number.
+    """
+    with CorpusWriter(path, metadata) as writer:
+        for number, line in enumerate(lines, 1):
+            fields = line.split()
+            try:
+                writer.add(fields[0], fields[1] if len(fields) > 1 else None)
+            except CorpusError as error:
+                raise CorpusError(f"puzzle {number}: {error}") from None
+        return len(writer)
+
+
+def unpack_text(path, with_solutions=False):
+    """
+    Yields the puzzles of a corpus as text-format lines, with the stored solution after a space when
+    `with_solutions` is set and the puzzle has one.
+    """
+    with Corpus(path) as corpus:
+        for index in range(len(corpus)):
+            line = corpus.text(index)
+            if with_solutions:
+                solution = corpus.solution(index)
+                if solution is not None:
+                    line += " " + grid.format_grid(solution)
+            yield line
+
+
+def read_puzzle(path, index=0):
+    """
+    Reads one puzzle from a corpus or a text puzzle file.
+
+    Args:
+    - path: A corpus file, or a text file with one puzzle per line (blank lines and `#` comments are
+      skipped, and anything after the puzzle on its line is ignored).
+    - index: The puzzle's position in the file, from 0.
+
+    Returns:
+    - The puzzle as a list of row lists.
+
+    Raises:
+    - IndexError: If the file has no puzzle `index`.
+    - GridError: If that line of a text file is not a valid puzzle.
+    """
+    if is_corpus(path):
+        with Corpus(path) as corpus:
+            return corpus.grid(index)
+    with open(path, "r") as source:
+        lines = (line.strip() for line in source)
+        count = 0
+        for line in lines:
+            if line and not line.startswith("#"):
+                if count == index:
+                    return grid.parse_grid(line.split()[0])
+                count += 1
+    raise IndexError(f"index {index} out of range for a file of {count} puzzles")
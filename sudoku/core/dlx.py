@@ -0,0 +1,246 @@
+"""
+Dancing Links (Knuth's Algorithm X) exact-cover engine.
+
+Sudoku is modelled as an exact-cover problem with four constraint columns per cell (every cell filled,
+and every digit once per row, column and box) and one candidate row per cell and digit: 324 columns
+and 729 rows for a 9x9 board. The links live in flat integer lists built once per board size; each
+solve copies them and then only relinks existing nodes, so the search itself allocates nothing.
+"""
+
+import functools
+
+from sudoku.core import engine, geometry
+from sudoku.core.cancel import CHECK_INTERVAL
+
+
+class _Template(object):
+    """The pristine links for one board size, copied by every DancingLinks instance."""
+
+    def __init__(self, shape):
+        size, cell_count = shape.size, shape.cell_count
+        self.size = size
+        self.column_count = 4 * cell_count  # Cell filled, then row/digit, column/digit and box/digit
+        self.row_count = cell_count * size
+        node_count = 1 + self.column_count + 4 * self.row_count  # Root, headers, four nodes per row
+
+        left = list(range(-1, node_count - 1))
+        right = list(range(1, node_count + 1))
+        up = list(range(node_count))
+        down = list(range(node_count))
+        column = list(range(node_count))
+        sizes = [0] * (1 + self.column_count)
+        row_of_node = [-1] * node_count
+        first_node = [0] * self.row_count
+
+        # Circular header list: root (node 0) followed by the column headers
+        left[0] = self.column_count
+        right[self.column_count] = 0
+
+        node = 1 + self.column_count
+        for row_id in range(self.row_count):
+            first_node[row_id] = node
+            for offset, header in enumerate(self._constraint_columns(shape, row_id)):
+                # Append the node to the bottom of its column
+                column[node] = header
+                row_of_node[node] = row_id
+                up[node] = up[header]
+                down[node] = header
+                down[up[header]] = node
+                up[header] = node
+                sizes[header] += 1
+
+                # Link the four nodes of the row into a circle
+                left[node] = node - 1 if offset else node + 3
+                right[node] = node + 1 if offset < 3 else node - 3
+                node += 1
+
+        self.left, self.right, self.up, self.down, self.sizes = left, right, up, down, sizes
+        self.column_of_node, self.row_of_node, self.first_node = column, row_of_node, first_node
+
+    @staticmethod
+    def _constraint_columns(shape, row_id):
+        # The four column headers (1-based) covered by placing digit row_id % size + 1 in its cell
+        size, cell_count = shape.size, shape.cell_count
+        cell, digit = divmod(row_id, size)
+        return (
+            1 + cell,
+            1 + cell_count + shape.row_of[cell] * size + digit,
+            1 + 2 * cell_count + shape.col_of[cell] * size + digit,
+            1 + 3 * cell_count + shape.box_of[cell] * size + digit,
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _template(box):
+    return _Template(geometry.geometry(box))
+
+
+class DancingLinks(engine.Search):
+    """
+    A single-use exact-cover search over a flat, row-major list of cell values (0 for empty), for a
+    board of any supported size.
+
+    Mirrors BitmaskSearch: construct with the cells, an optional CancelToken, optional candidate masks
+    and an optional SolveObserver, call run(limit), then read `count`, `solution` and the counters.
+    """
+
+    def __init__(self, cells, token=None, candidates=None, observer=None):
+        super().__init__(cells, token, observer)
+        template = _template(geometry.for_cells(len(self.cells)).box)
+        self.left = template.left[:]
+        self.right = template.right[:]
+        self.up = template.up[:]
+        self.down = template.down[:]
+        self.size = template.sizes[:]
+        self.column_of_node = template.column_of_node
+        self.row_of_node = template.row_of_node
+        self.digits = template.size
+        self.chosen = [0] * len(self.cells)  # Preallocated stack of chosen rows, indexed by depth
+
+        # Drop the rows for ruled-out candidates before anything is covered
+        first_node, digits = template.first_node, template.size
+        if candidates is not None:
+            for cell in range(len(self.cells)):
+                for digit in range(digits):
+                    if not candidates[cell] & (1 << digit):
+                        self._remove_row(first_node[cell * digits + digit])
+
+        # Select the rows for the givens; a given whose constraint is already met is a conflict
+        covered = [False] * (1 + template.column_count)
+        for cell, value in enumerate(self.cells):
+            if value == 0:
+                continue
+            first = first_node[cell * digits + value - 1]
+            headers = [self.column_of_node[first + k] for k in range(4)]
+            if any(covered[header] for header in headers):
+                self.consistent = False
+                return
+            for header in headers:
+                covered[header] = True
+                self._cover(header)
+
+    def _remove_row(self, first):
+        # Unlink the four nodes of a row from their columns for good
+        up, down, size, column_of_node = self.up, self.down, self.size, self.column_of_node
+        for node in range(first, first + 4):
+            up[down[node]] = up[node]
+            down[up[node]] = down[node]
+            size[column_of_node[node]] -= 1
+
+    def _cover(self, header):
+        left, right, up, down, size = self.left, self.right, self.up, self.down, self.size
+        column_of_node = self.column_of_node
+
+        # Unlink the header, then every row that meets this constraint from the other columns
+        left[right[header]] = left[header]
+        right[left[header]] = right[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[column_of_node[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, header):
+        left, right, up, down, size = self.left, self.right, self.up, self.down, self.size
+        column_of_node = self.column_of_node
+
+        # Exactly reverse _cover, walking in the opposite direction
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column_of_node[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        left[right[header]] = header
+        right[left[header]] = header
+
+    def _search(self, depth, limit):
+        self.nodes += 1
+        if self.checking:
+            self.budget -= 1
+            if not self.budget:
+                self.budget = CHECK_INTERVAL
+                self._checkpoint(depth)
+
+        right, down, size = self.right, self.down, self.size
+
+        if right[0] == 0:
+            # Every constraint is covered: record the solution and stop once enough have been seen
+            self.count += 1
+            if self.solution is None:
+                solution = list(self.cells)
+                for k in range(depth):
+                    cell, digit = divmod(self.row_of_node[self.chosen[k]], self.digits)
+                    solution[cell] = digit + 1
+                self.solution = solution
+            if depth > self.max_depth:
+                self.max_depth = depth
+            if self.count >= limit:
+                self.stop_depth = depth
+                return True
+            return False
+
+        # Branch on the column with the fewest remaining rows
+        header = right[0]
+        best_size = size[header]
+        j = right[header]
+        while j != 0 and best_size > 1:
+            if size[j] < best_size:
+                header, best_size = j, size[j]
+            j = right[j]
+
+        if best_size == 0:
+            if depth > self.max_depth:
+                self.max_depth = depth
+            return False  # Dead end: a constraint can no longer be met
+
+        self._cover(header)
+        left, column_of_node = self.left, self.column_of_node
+        i = down[header]
+        while i != header:
+            self.chosen[depth] = i
+            j = right[i]
+            while j != i:
+                self._cover(column_of_node[j])
+                j = right[j]
+
+            if self._search(depth + 1, limit):
+                return True  # Leave the links as-is: the search is finished
+
+            j = left[i]
+            while j != i:
+                self._uncover(column_of_node[j])
+                j = left[j]
+            i = down[i]
+
+        self._uncover(header)
+        return False
+
+
+def count_solutions(grid, limit=2, token=None, candidates=None, stats=None):
+    """
+    Counts the solutions of a grid with Dancing Links, stopping as soon as `limit` have been found.
+
+    Takes the same arguments as engine.count_solutions, and likewise fills the grid in with the first
+    solution found.
+    """
+    return engine.count_solutions(grid, limit, token, candidates, stats, DancingLinks)
+
+
+def solve(grid, token=None, candidates=None, stats=None):
+    """
+    Solves a Sudoku grid in place using Dancing Links.
+
+    Gives the same answer as the backtracking engine on 9x9 boards, where grids with several solutions
+    are resolved to the one a row-major backtracker would have found first. On larger boards such
+    grids get the first solution the search reaches, which may differ between the engines. Takes the
+    same arguments as engine.solve.
+    """
+    return engine.solve(grid, token, candidates, stats, DancingLinks)
@@ -0,0 +1,292 @@
+"""
+Bitmask constraint engine used to solve Sudoku grids.
+
+Row, column and box usage is kept as bitmasks (bit d set means digit d + 1 is used) which are
+updated incrementally as digits are placed and undone. The search always branches on the empty
+cell with the fewest remaining candidates (minimum remaining values), which keeps the search tree
+small even on puzzles that defeat a row-major backtracker. Boards of any box size are supported;
+the unit lookups come from the shared geometry tables.
+"""
+
+from sudoku.core import board, geometry, logic
+from sudoku.core.cancel import CHECK_INTERVAL
+
+
+class Search(object):
+    """
+    Plumbing shared by the engines' single-use searches: the counters, cancellation and observer
+    checks, and run(). Subclasses set up their constraint state in __init__ (clearing `consistent`
+    when the givens already conflict) and implement _search(depth, limit), which returns True once
+    `limit` solutions have been found.
+
+    Attributes:
+    - count: Solutions found so far; the first one is kept in `solution`.
+    - nodes, max_depth: Search nodes expanded and the deepest level reached.
+    """
+
+    def __init__(self, cells, token=None, observer=None):
+        self.cells = list(cells)
+        self.token = token
+        self.observer = observer
+        self.checking = token is not None or observer is not None
+        self.budget = CHECK_INTERVAL
+        self.count = 0
+        self.nodes = 0
+        self.max_depth = 0
+        self.stop_depth = 0
+        self.solution = None
+        self.consistent = True
+
+    def run(self, limit=1):
+        """
+        Searches for solutions, stopping as soon as `limit` of them have been found.
+
+        Args:
+        - limit: The number of solutions after which the search stops.
+
+        Returns:
+        - The number of solutions found (never more than `limit`). The first one is kept in `solution`.
+        """
+        if self.consistent:
+            self._search(0, limit)
+        return self.count
+
+    @property
+    def backtracks(self):
+        # Every node but the root was entered by a placement; all of them were undone except the
+        # ones still on the stack when the search stopped at its last solution
+        return max(0, self.nodes - 1 - self.stop_depth)
+
+    def _checkpoint(self, depth):
+        # Called every CHECK_INTERVAL nodes, and only when a token or observer was given
+        if self.token is not None:
+            self.token.check()
+        if self.observer is not None:
+            self.observer.on_progress(self.nodes, depth)
+
+    def _search(self, depth, limit):
+        raise NotImplementedError
+
+
+class BitmaskSearch(Search):
+    """
+    A single-use depth-first search over a flat, row-major list of cell values (0 for empty). The
+    board size is taken from the number of cells (81, 256 or 625).
+
+    The search mutates its own copy of the cells while it runs, so create a new instance for every
+    search rather than calling run() twice. An optional CancelToken is checked every CHECK_INTERVAL
+    nodes; SolveCancelled propagates out of run() when it fires. Optional per-cell candidate masks
+    (such as those from logic.reduce_candidates) further restrict the digits tried in each cell.
+
+    Counters (`nodes`, `backtracks`, `max_depth`) are always kept. An optional SolveObserver has its
+    on_progress hook called every CHECK_INTERVAL nodes; without a token or observer the search pays
+    for no checks at all.
+    """
+
+    def __init__(self, cells, token=None, candidates=None, observer=None):
+        super().__init__(cells, token, observer)
+        shape = geometry.for_cells(len(self.cells))
+        self.row_of, self.col_of, self.box_of = shape.row_of, shape.col_of, shape.box_of
+        self.bit_count, self.digit_of_bit = shape.bit_count, shape.digit_of_bit
+        self.allowed = list(candidates) if candidates is not None else [shape.all_digits] * shape.cell_count
+        self.rows = [0] * shape.size
+        self.cols = [0] * shape.size
+        self.boxes = [0] * shape.size
+        self.empty = []
+
+        # Record the givens; a repeated digit in any unit makes the grid unsolvable
+        for i, value in enumerate(self.cells):
+            if value == 0:
+                self.empty.append(i)
+                continue
+            bit = 1 << (value - 1)
+            r, c, b = self.row_of[i], self.col_of[i], self.box_of[i]
+            if (self.rows[r] | self.cols[c] | self.boxes[b]) & bit:
+                self.consistent = False
+            self.rows[r] |= bit
+            self.cols[c] |= bit
+            self.boxes[b] |= bit
+
+    def _search(self, depth, limit):
+        self.nodes += 1
+        if self.checking:
+            self.budget -= 1
+            if not self.budget:
+                self.budget = CHECK_INTERVAL
+                self._checkpoint(depth)
+
+        empty = self.empty
+        if depth == len(empty):
+            # Every cell is filled: record the solution and stop once enough have been seen
+            self.count += 1
+            if self.solution is None:
+                self.solution = list(self.cells)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            if self.count >= limit:
+                self.stop_depth = depth
+                return True
+            return False
+
+        rows, cols, boxes, allowed = self.rows, self.cols, self.boxes, self.allowed
+        row_of, col_of, box_of, bit_count = self.row_of, self.col_of, self.box_of, self.bit_count
+
+        # Pick the empty cell with the fewest candidates (the first one found on ties)
+        best = depth
+        best_count = len(rows) + 1
+        best_mask = 0
+        for k in range(depth, len(empty)):
+            i = empty[k]
+            mask = ~(rows[row_of[i]] | cols[col_of[i]] | boxes[box_of[i]]) & allowed[i]
+            count = bit_count[mask]
+            if count < best_count:
+                best, best_count, best_mask = k, count, mask
+                if count <= 1:
+                    break
+
+        if best_count == 0:
+            if depth > self.max_depth:
+                self.max_depth = depth
+            return False  # Dead end: some cell has no legal digit left
+
+        # Move the chosen cell to the front of the unfilled region
+        empty[depth], empty[best] = empty[best], empty[depth]
+        i = empty[depth]
+        r, c, b = row_of[i], col_of[i], box_of[i]
+        cells, digit_of_bit = self.cells, self.digit_of_bit
+
+        # Try the candidates in ascending order, lowest bit first
+        while best_mask:
+            bit = best_mask & -best_mask
+            best_mask ^= bit
+
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+            cells[i] = digit_of_bit[bit]
+
+            if self._search(depth + 1, limit):
+                return True  # Leave the state as-is: the search is finished
+
+            rows[r] ^= bit
+            cols[c] ^= bit
+            boxes[b] ^= bit
+
+        cells[i] = 0
+        return False
+
+
+def first_in_reading_order(cells, solution, token=None, candidates=None, stats=None, search_class=None):
+    """
+    Finds the solution that a row-major backtracker trying digits in ascending order would reach first.
+
+    This is the lexicographically smallest solution when read row by row. Starting from any known
+    solution, each empty cell is fixed in turn to the smallest digit that still leaves the grid
+    solvable. That takes a search per smaller digit of every cell, which is cheap on 9x9 boards but
+    can run for minutes on wide-open larger ones, so the engines only use it on 9x9.
+
+    Args:
+    - cells: A flat, row-major list of values (0 for empty) that has at least one solution.
+    - solution: Any solution of `cells`.
+    - token: Optional CancelToken passed on to every search.
+    - candidates: Optional candidate masks of `cells` (from logic.reduce_candidates); digits outside
+      them are skipped and every search stays within them.
+    - stats: Optional SolveStats that the searches' counters are added to (but not their solutions).
+    - search_class: The search to run, BitmaskSearch (the default) or dlx.DancingLinks.
+
+    Returns:
+    - The reading-order-first solution as a flat list of values.
+    """
+    search_class = search_class or BitmaskSearch
+    prefix = list(cells)
+    for i in range(len(prefix)):
+        if prefix[i] != 0:
+            continue
+        for digit in range(1, solution[i]):
+            if candidates is not None and not candidates[i] & (1 << (digit - 1)):
+                continue  # Ruled out by the presolve, so no solution has it
+            prefix[i] = digit
+            search = search_class(prefix, token, candidates)
+            try:
+                found = search.run(limit=1)
+            finally:
+                if stats is not None:
+                    stats.add_search(search, solutions=False)
+            if found:
+                solution = search.solution  # A smaller digit works here
+                break
+        prefix[i] = solution[i]
+    return solution
+
+
+def count_solutions(grid, limit=2, token=None, candidates=None, stats=None, search_class=None):
+    """
+    Counts the solutions of a grid, stopping as soon as `limit` have been found.
+
+    Args:
+    - grid: A Board or list of row lists with 0 for empty cells. If any solution exists, the grid is
+      filled in with the first one the search reached (not necessarily the row-major-first one).
+    - limit: The number of solutions after which counting stops.
+    - token: Optional CancelToken; the grid is left untouched if the search is cancelled.
+    - candidates: Optional list of per-cell candidate masks (from logic.reduce_candidates) to search within.
+    - stats: Optional SolveStats that the search's counters are added to.
+    - search_class: The Search subclass to run, BitmaskSearch (the default) or dlx.DancingLinks.
+
+    Returns:
+    - The number of solutions found, at most `limit`.
+
+    Raises:
+    - SolveCancelled: If the token is cancelled or runs out of time before the search finishes.
+    """
+    cells = board.cells_of(grid)
+    if candidates is not None:
+        cells = logic.fill_singles(cells, candidates)
+
+    search_class = search_class or BitmaskSearch
+    search = search_class(cells, token, candidates, stats.observer if stats is not None else None)
+    try:
+        found = search.run(limit)
+    finally:
+        if stats is not None:
+            stats.add_search(search)
+    if found:
+        board.assign(grid, search.solution)
+    return found
+
+
+def solve(grid, token=None, candidates=None, stats=None, search_class=None):
+    """
+    Solves a Sudoku grid in place.
+
+    On 9x9 boards the result is identical to that of the original row-major backtracker: uniquely
+    solvable grids have only one answer, and grids with several answers are resolved to the one it
+    would have found first. Larger boards never had that backtracker, so they get the first solution
+    the search reaches.
+
+    Args:
+    - grid: A Board or list of row lists with 0 for empty cells. It is filled in when a solution exists.
+    - token: Optional CancelToken; the grid is left untouched if the search is cancelled.
+    - candidates: Optional list of per-cell candidate masks (from logic.reduce_candidates) to search within.
+    - stats: Optional SolveStats that the search's counters are added to.
+    - search_class: The Search subclass to run, BitmaskSearch (the default) or dlx.DancingLinks.
+
+    Returns:
+    - True if the puzzle is successfully solved, False otherwise.
+
+    Raises:
+    - SolveCancelled: If the token is cancelled or runs out of time before the search finishes.
+    """
+    cells = board.cells_of(grid)
+
+    # On 9x9, look for a second solution too, so ambiguous grids can be resolved deterministically
+    if len(cells) != geometry.STANDARD.cell_count:
+        return count_solutions(grid, 1, token, candidates, stats, search_class) > 0
+    # The count works on a copy, so a cancelled tie-break leaves the grid untouched too
+    work = board.copy_of(grid)
+    found = count_solutions(work, 2, token, candidates, stats, search_class)
+    if found:
+        solution = board.cells_of(work)
+        if found > 1:
+            solution = first_in_reading_order(cells, solution, token, candidates, stats, search_class)
+        board.assign(grid, solution)
+    return found > 0
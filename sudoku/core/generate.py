@@ -0,0 +1,143 @@
+"""
+Random puzzle generation with guaranteed unique solutions.
+
+A random full grid is built first, then clues are removed one at a time (or in 180-degree symmetric
+pairs), keeping each removal only if the puzzle still has exactly one solution. Everything is driven
+by a single random.Random seeded per puzzle, so a seed always reproduces the same puzzle.
+"""
+
+import random
+
+from sudoku.core import geometry, logic, solver
+from sudoku.core.engine import BitmaskSearch
+
+DIFFICULTIES = ("easy", "medium", "hard")
+MAX_ATTEMPTS = 50  # Fresh grids to try before giving up on a target clue count or difficulty
+
+
+class GenerationError(Exception):
+    """Raised when no puzzle matching the requested clue count or difficulty could be produced."""
+
+
+def random_solution(rng):
+    """
+    Builds a random, completely filled grid.
+
+    The three diagonal boxes are independent, so they are filled with random permutations and the
+    rest is completed by the solver. Shuffling rows within bands and columns within stacks then
+    spreads the randomness over the whole grid.
+
+    Args:
+    - rng: A random.Random instance.
+
+    Returns:
+    - A flat, row-major list of 81 digits.
+    """
+    cells = [0] * 81
+    for box in range(3):
+        digits = rng.sample(range(1, 10), 9)
+        for k, digit in enumerate(digits):
+            cells[(box * 3 + k // 3) * 9 + box * 3 + k % 3] = digit
+
+    search = BitmaskSearch(cells)
+    search.run(limit=1)
+    filled = search.solution
+
+    rows = [band * 3 + i for band in rng.sample(range(3), 3) for i in rng.sample(range(3), 3)]
+    cols = [stack * 3 + j for stack in rng.sample(range(3), 3) for j in rng.sample(range(3), 3)]
+    return [filled[rows[r] * 9 + cols[c]] for r in range(9) for c in range(9)]
+
+
+def rate(cells):
+    """
+    Rates a uniquely solvable puzzle by the techniques needed to solve it.
+
+    Args:
+    - cells: A flat, row-major list of 81 values (0 for empty).
+
+    Returns:
+    - "easy" if singles alone solve it, "medium" if pairs or pointing/claiming are also needed, and
+      "hard" if the logical techniques stall and a search is required.
+    """
+    candidates, fired = logic.reduce_candidates(cells)
+    if candidates is None or any(geometry.STANDARD.bit_count[mask] != 1 for mask in candidates):
+        return "hard"
+    if set(fired) <= {"naked_single", "hidden_single"}:
+        return "easy"
+    return "medium"
+
+
+def _removal_order(rng, symmetric):
+    # Groups of cells to blank together: single cells, or pairs mirrored through the centre
+    cells = list(range(81))
+    rng.shuffle(cells)
+    if not symmetric:
+        return [(cell,) for cell in cells]
+    return [(cell, 80 - cell) if cell != 40 else (cell,) for cell in cells if cell <= 40]
+
+
+def _dig(rng, solution, clues, difficulty, symmetric):
+    # Remove clues while the puzzle stays unique (and no harder than the target difficulty)
+    ceiling = DIFFICULTIES.index(difficulty) if difficulty else None
+    puzzle = list(solution)
+    remaining = 81
+    for group in _removal_order(rng, symmetric):
+        if clues is not None and remaining - len(group) < clues:
+            continue
+        for cell in group:
+            puzzle[cell] = 0
+
+        grid = [puzzle[row * 9:row * 9 + 9] for row in range(9)]
+        keep = solver.count_solutions(grid, limit=2) == 1
+        if keep and ceiling is not None and ceiling < 2:
+            keep = DIFFICULTIES.index(rate(puzzle)) <= ceiling
+
+        if keep:
+            remaining -= len(group)
+            if remaining == clues:
+                break
+        else:
+            for cell in group:
+                puzzle[cell] = solution[cell]
+    return puzzle, remaining
+
+
+def generate_puzzle(seed, clues=None, difficulty=None, symmetric=True):
+    """
+    Generates a puzzle with exactly one solution.
+
+    Args:
+    - seed: Any value accepted by random.Random; the same seed always gives the same puzzle.
+    - clues: Optional target number of givens (17-81). Without it clues are removed until no more can
+      go without losing uniqueness.
+    - difficulty: Optional target rating, one of DIFFICULTIES (see rate()).
+    - symmetric: If True, clues are removed in pairs mirrored through the centre cell.
+
+    Returns:
+    - (puzzle, solution) as 9x9 lists of lists, with 0 for empty cells in the puzzle.
+
+    Raises:
+    - ValueError: If the clue count or difficulty is out of range.
+    - GenerationError: If no matching puzzle was found within MAX_ATTEMPTS fresh grids.
+    """
+    if clues is not None and not 17 <= clues <= 81:
+        raise ValueError("clues must be between 17 and 81")
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+
+    rng = random.Random(seed)
+    for _ in range(MAX_ATTEMPTS):
+        solution = random_solution(rng)
+        puzzle, remaining = _dig(rng, solution, clues, difficulty, symmetric)
+        if clues is not None and remaining != clues:
+            continue  # Could not get down to the target count; try another grid
+        if difficulty is not None and rate(puzzle) != difficulty:
+            continue
+        return (
+            [puzzle[row * 9:row * 9 + 9] for row in range(9)],
+            [solution[row * 9:row * 9 + 9] for row in range(9)],
+        )
+
+    raise GenerationError(
+        f"no puzzle found for clues={clues}, difficulty={difficulty} after {MAX_ATTEMPTS} tries"
+    )
@@ -0,0 +1,124 @@
+"""
+Index tables for square boards of any box size.
+
+A board with box size n has n * n rows, columns, boxes and digits, and n ** 4 cells numbered
+row-major; the classic 9x9 puzzle has box size 3. Tables are built once per box size on first use
+and shared by every engine, so per-cell lookups are plain list indexing.
+"""
+
+import functools
+
+MIN_BOX = 3  # 9x9 boards; a stray 16-character line must not parse as a 4x4 puzzle
+MAX_BOX = 5  # 25x25 boards; the text format has symbols for up to 25 digits
+
+
+class _PopCount(object):
+    # Stands in for the candidate-count table when one would be too large (more than 16 digits)
+    __slots__ = ()
+    __getitem__ = staticmethod(int.bit_count)
+
+
+class Geometry(object):
+    """
+    Precomputed lookups for a board with the given box size.
+
+    Attributes:
+    - box: Box width and height (3 for 9x9).
+    - size: Rows, columns, boxes and digits per unit (box * box).
+    - cell_count: Number of cells (size * size).
+    - all_digits: Candidate mask with every digit set (bit d means digit d + 1).
+    - row_of, col_of, box_of: The row, column and box of each cell.
+    - rows, columns, boxes: The cells of each unit, row-major.
+    - units: rows + columns + boxes.
+    - peers: For each cell, the sorted cells sharing a unit with it.
+    - intersections: (cells in both, rest of the line, rest of the box) for every box and every
+      row or column crossing it.
+    - bit_count: Number of candidates in a mask, indexed by mask.
+    - digit_of_bit: The digit of every single-bit mask.
+    """
+
+    def __init__(self, box):
+        size = box * box
+        cell_count = size * size
+        self.box = box
+        self.size = size
+        self.cell_count = cell_count
+        self.all_digits = (1 << size) - 1
+
+        self.row_of = [i // size for i in range(cell_count)]
+        self.col_of = [i % size for i in range(cell_count)]
+        self.box_of = [(i // (size * box)) * box + (i % size) // box for i in range(cell_count)]
+
+        self.rows = [[row * size + col for col in range(size)] for row in range(size)]
+        self.columns = [[row * size + col for row in range(size)] for col in range(size)]
+        self.boxes = [
+            [(box * (b // box) + i) * size + box * (b % box) + j for i in range(box) for j in range(box)]
+            for b in range(size)
+        ]
+        self.units = self.rows + self.columns + self.boxes
+
+        self.peers = [
+            sorted(set(self.rows[self.row_of[cell]] + self.columns[self.col_of[cell]] + self.boxes[self.box_of[cell]])
+                   - {cell})
+            for cell in range(cell_count)
+        ]
+
+        self.intersections = []
+        for box_cells in self.boxes:
+            box_set = set(box_cells)
+            for line in self.rows + self.columns:
+                shared = box_set.intersection(line)
+                if shared:
+                    self.intersections.append((
+                        sorted(shared),
+                        [cell for cell in line if cell not in shared],
+                        [cell for cell in box_cells if cell not in shared],
+                    ))
+
+        if size <= 16:
+            self.bit_count = [bin(mask).count("1") for mask in range(self.all_digits + 1)]
+        else:
+            self.bit_count = _PopCount()
+        self.digit_of_bit = {1 << d: d + 1 for d in range(size)}
+
+
+@functools.lru_cache(maxsize=None)
+def geometry(box):
+    """
+    Returns the shared Geometry for a box size.
+
+    Raises:
+    - ValueError: If the box size is outside MIN_BOX-MAX_BOX.
+    """
+    if not MIN_BOX <= box <= MAX_BOX:
+        raise ValueError(f"box size must be between {MIN_BOX} and {MAX_BOX}, got {box}")
+    return Geometry(box)
+
+
+def for_size(size):
+    """
+    Returns the Geometry of a board with `size` rows (9, 16, 25, ...).
+
+    Raises:
+    - ValueError: If no supported box size gives that many rows.
+    """
+    for box in range(MIN_BOX, MAX_BOX + 1):
+        if box * box == size:
+            return geometry(box)
+    raise ValueError(f"unsupported board size {size}")
+
+
+def for_cells(cell_count):
+    """
+    Returns the Geometry of a board with `cell_count` cells (81, 256, 625, ...).
+
+    Raises:
+    - ValueError: If no supported box size gives that many cells.
+    """
+    for box in range(MIN_BOX, MAX_BOX + 1):
+        if box ** 4 == cell_count:
+            return geometry(box)
+    raise ValueError(f"unsupported board with {cell_count} cells")
+
+
+STANDARD = geometry(3)
@@ -0,0 +1,63 @@
+"""
+Conversion between the text format and grids.
+
+The text format lists the cells row by row, using `0` or `.` for blanks. Digits 1-9 are written as
+themselves and larger digits as letters (A = 10, ..., P = 25), so a 9x9 puzzle is 81 characters, a
+16x16 one 256 and a 25x25 one 625. The board size is inferred from the length.
+"""
+
+from sudoku.core import geometry
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"  # The symbol for digit d is SYMBOLS[d - 1]
+_VALUES = {symbol: value for value, symbol in enumerate(SYMBOLS, 1)}
+_VALUES.update({symbol.lower(): value for symbol, value in list(_VALUES.items())})
+_VALUES.update({"0": 0, ".": 0})
+
+
+class GridError(ValueError):
+    """Raised when text cannot be parsed as a Sudoku grid."""
+
+
+def parse_grid(text):
+    """
+    Parses a puzzle string into a grid.
+
+    Surrounding whitespace is ignored, so lines read straight from a file can be passed in.
+
+    Args:
+    - text: The puzzle, row by row, with 1-9 and A-P for givens and `0` or `.` for blanks.
+
+    Returns:
+    - A list of row lists (9x9, 16x16 or 25x25) with 0 for empty cells.
+
+    Raises:
+    - GridError: If the length is not that of a supported board, or a character is not a valid
+      symbol for that size.
+    """
+    text = text.strip()
+    try:
+        size = geometry.for_cells(len(text)).size
+    except ValueError:
+        raise GridError(f"expected 81, 256 or 625 cells, got {len(text)}") from None
+
+    cells = []
+    for char in text:
+        value = _VALUES.get(char, -1)
+        if not 0 <= value <= size:
+            raise GridError(f"invalid cell character {char!r}")
+        cells.append(value)
+
+    return [cells[row * size:row * size + size] for row in range(size)]
+
+
+def format_grid(grid):
+    """
+    Formats a grid as a string, using `0` for empty cells.
+
+    Args:
+    - grid: A list of row lists with 0 for empty cells.
+
+    Returns:
+    - The grid row by row as a single string.
+    """
+    return "".join(SYMBOLS[value - 1] if value else "0" for row in grid for value in row)
@@ -0,0 +1,211 @@
+"""
+Logical candidate reduction applied before any search.
+
+Each cell carries a candidate mask (bit d set means digit d + 1 is still possible), the same encoding
+the engines use, on boards of any box size. The techniques below are applied cheapest first, starting over from naked
+singles whenever one of them makes progress, until nothing changes. Every deduction holds in every
+solution, so the reduced candidates never rule out an answer.
+"""
+
+import collections
+
+from sudoku.core import geometry
+
+
+class _Contradiction(Exception):
+    """Raised internally when a cell runs out of candidates or a unit cannot hold a digit."""
+
+
+class _Board(object):
+    """Candidate masks plus the set of cells whose digit has already been removed from their peers."""
+
+    def __init__(self, cells, candidates=None):
+        self.geometry = geometry.for_cells(len(cells))
+        if candidates is not None:
+            # The givens' digits are already gone from their peers
+            self.candidates = list(candidates)
+            self.placed = [value != 0 for value in cells]
+            return
+        all_digits = self.geometry.all_digits
+        self.candidates = [all_digits if value == 0 else 1 << (value - 1) for value in cells]
+        self.placed = [False] * len(cells)
+
+    def place(self, cell, bit):
+        # Fix the cell to a single digit and remove that digit from every peer
+        candidates = self.candidates
+        candidates[cell] = bit
+        self.placed[cell] = True
+        for peer in self.geometry.peers[cell]:
+            if candidates[peer] & bit:
+                candidates[peer] &= ~bit
+                if not candidates[peer]:
+                    raise _Contradiction()
+
+    def eliminate(self, cells, mask):
+        # Remove the digits in `mask` from the given cells, returning how many candidates went
+        candidates, bit_count = self.candidates, self.geometry.bit_count
+        removed = 0
+        for cell in cells:
+            hit = candidates[cell] & mask
+            if hit:
+                candidates[cell] &= ~hit
+                if not candidates[cell]:
+                    raise _Contradiction()
+                removed += bit_count[hit]
+        return removed
+
+
+def naked_singles(board):
+    # A cell with one candidate left must hold it
+    bit_count = board.geometry.bit_count
+    placed = 0
+    for cell in range(len(board.candidates)):
+        if not board.placed[cell] and bit_count[board.candidates[cell]] == 1:
+            board.place(cell, board.candidates[cell])
+            placed += 1
+    return placed
+
+
+def hidden_singles(board):
+    # A digit with only one possible cell in a unit must go there
+    candidates, shape = board.candidates, board.geometry
+    placed = 0
+    for unit in shape.units:
+        once = twice = 0
+        for cell in unit:
+            twice |= once & candidates[cell]
+            once |= candidates[cell]
+        if once != shape.all_digits:
+            raise _Contradiction()  # Some digit has nowhere to go in this unit
+
+        unique = once & ~twice
+        for cell in unit:
+            bit = candidates[cell] & unique
+            if bit and not board.placed[cell]:
+                if shape.bit_count[bit] > 1:
+                    raise _Contradiction()  # Two digits both need this cell
+                board.place(cell, bit)
+                placed += 1
+    return placed
+
+
+def naked_pairs(board):
+    # Two cells in a unit with the same two candidates take both digits away from the rest of the unit
+    candidates, bit_count = board.candidates, board.geometry.bit_count
+    removed = 0
+    for unit in board.geometry.units:
+        seen = {}
+        for cell in unit:
+            mask = candidates[cell]
+            if bit_count[mask] != 2 or board.placed[cell]:
+                continue
+            if mask in seen:
+                pair = (seen[mask], cell)
+                removed += board.eliminate([other for other in unit if other not in pair], mask)
+            else:
+                seen[mask] = cell
+    return removed
+
+
+def hidden_pairs(board):
+    # Two digits confined to the same two cells of a unit rule out every other digit in those cells
+    candidates, shape = board.candidates, board.geometry
+    removed = 0
+    for unit in shape.units:
+        positions = {}
+        for digit in range(shape.size):
+            bit = 1 << digit
+            cells = tuple(cell for cell in unit if candidates[cell] & bit)
+            if len(cells) == 2:
+                positions.setdefault(cells, 0)
+                positions[cells] |= bit
+
+        for cells, mask in positions.items():
+            if shape.bit_count[mask] == 2:
+                removed += board.eliminate(cells, shape.all_digits & ~mask)
+    return removed
+
+
+def pointing_and_claiming(board):
+    # Where a box and a line intersect, a digit confined to the intersection on one side is removed
+    # from the other side: box -> line is "pointing", line -> box is "claiming" (box/line reduction)
+    candidates = board.candidates
+    pointing = claiming = 0
+    for shared, rest_of_line, rest_of_box in board.geometry.intersections:
+        in_shared = in_line = in_box = 0
+        for cell in shared:
+            in_shared |= candidates[cell]
+        for cell in rest_of_line:
+            in_line |= candidates[cell]
+        for cell in rest_of_box:
+            in_box |= candidates[cell]
+
+        pointing += board.eliminate(rest_of_line, in_shared & ~in_box)
+        claiming += board.eliminate(rest_of_box, in_shared & ~in_line)
+    return pointing, claiming
+
+
+def reduce_candidates(cells, candidates=None):
+    """
+    Applies naked/hidden singles, naked/hidden pairs and pointing/claiming until nothing changes.
+
+    Args:
+    - cells: A flat, row-major list of values (0 for empty) for a board of any supported size.
+    - candidates: Optional starting masks with every given's digit already removed from its peers
+      (such as ConflictIndex.candidate_masks()), so the givens need not be placed again.
+
+    Returns:
+    - (candidates, fired): candidates is a list of per-cell masks, or None if the grid was found to have no
+      solution. fired is a Counter of technique name -> number of deductions (placements for singles,
+      eliminated candidates for the others).
+    """
+    board = _Board(cells, candidates)
+    fired = collections.Counter()
+    try:
+        # Givens only set up the starting candidates; they are not counted as deductions
+        if candidates is None:
+            for cell, value in enumerate(cells):
+                if value:
+                    board.place(cell, board.candidates[cell])
+        elif not all(board.candidates):
+            raise _Contradiction()
+
+        while True:
+            if _record(fired, "naked_single", naked_singles(board)):
+                continue
+            if _record(fired, "hidden_single", hidden_singles(board)):
+                continue
+            if _record(fired, "naked_pair", naked_pairs(board)):
+                continue
+            if _record(fired, "hidden_pair", hidden_pairs(board)):
+                continue
+            pointing, claiming = pointing_and_claiming(board)
+            if _record(fired, "pointing", pointing) | _record(fired, "claiming", claiming):
+                continue
+            break
+    except _Contradiction:
+        return None, fired
+
+    return board.candidates, fired
+
+
+def fill_singles(cells, candidates):
+    """
+    Returns a copy of `cells` with every empty cell that has a single candidate filled in.
+
+    Args:
+    - cells: A flat, row-major list of values (0 for empty).
+    - candidates: The matching list of candidate masks, as returned by reduce_candidates().
+    """
+    shape = geometry.for_cells(len(cells))
+    digit_of_bit, bit_count = shape.digit_of_bit, shape.bit_count
+    return [
+        digit_of_bit[candidates[cell]] if value == 0 and bit_count[candidates[cell]] == 1 else value
+        for cell, value in enumerate(cells)
+    ]
+
+
+def _record(fired, technique, count):
+    if count:
+        fired[technique] += count
+    return count > 0
@@ -0,0 +1,340 @@
+"""
+Searching one hard puzzle on several processes at once.
+
+After the usual presolve, the top of the search tree is expanded breadth-first, always branching on
+the open cell with the fewest candidates, until there are about TASKS_PER_WORKER independent
+subproblems per worker. Each subproblem is the puzzle with a few more cells fixed, and is searched by
+the normal engine in a worker process; a worker that finishes one takes the next off the pool's
+queue.
+
+When the queue runs dry while some subproblems are still being searched, the idle workers are
+counted in a shared value. A busy worker that sees it at a token check hands its subproblem back
+unfinished, and it is split again and queued, so the hard branches keep being shared out to the end.
+The nodes the handed-back search had already expanded are searched again by its children; a search
+only hands back after YIELD_AFTER nodes, which keeps that repeated work small.
+
+All workers share one stop event. As soon as enough solutions have been found (one for a solve) it
+is set, every running search notices it at its next token check, and the subproblems not yet
+started are dropped. The node counts of every subproblem that ran are merged into the caller's
+SolveStats.
+"""
+
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+
+from sudoku.core import board, geometry, logic, solver
+from sudoku.core.cancel import CHECK_INTERVAL, CancelToken, SolveCancelled
+from sudoku.core.stats import SolveStats
+
+TASKS_PER_WORKER = 4  # Subproblems per worker wanted from each split
+MAX_SPLIT_DEPTH = 12  # Branching levels expanded by one split at most
+YIELD_AFTER = 16 * CHECK_INTERVAL  # Nodes a subproblem's search runs before it may be handed back
+POLL_INTERVAL = 0.05  # Seconds between checks of the caller's token while the workers search
+
+_stop = None  # The stop event shared by a pool's workers, set up by _start_worker
+_idle = None  # The shared count of idle workers still waiting for a subproblem to be handed back
+
+
+def solve_parallel(grid, workers=None, engine=None, token=None, stats=None):
+    """
+    Solves a grid in place, splitting the search over several worker processes.
+
+    This only pays off on puzzles that need a long search (hard 16x16 and 25x25 boards in particular);
+    starting the workers costs more than solving a typical 9x9 puzzle outright.
+
+    For a puzzle with a single solution the result is the same as core.solve's. For a grid with
+    several, the search stops at whichever solution a worker reaches first, so the answer may differ
+    from core.solve's and from one run to the next.
+
+    Args:
+    - grid: A Board or list of row lists (9x9, 16x16 or 25x25) with 0 for empty cells. It is filled in
+      when a solution exists.
+    - workers: The number of worker processes. 1 searches in this process; None uses all cores.
+    - engine: The engine name, one of core.ENGINES (default: chosen by board size).
+    - token: Optional CancelToken used to cancel the search or give it a time budget.
+    - stats: Optional SolveStats that the merged counters of all workers are added to.
+
+    Returns:
+    - True if the puzzle is successfully solved, False otherwise.
+
+    Raises:
+    - SolveCancelled: If the token is cancelled (SolveTimeout if it ran out of time).
+    """
+    found, solution = _search(board.cells_of(grid), 1, workers, engine, token, stats)
+    if found:
+        board.assign(grid, solution)
+    return bool(found)
+
+
+def count_solutions_parallel(grid, limit=2, workers=None, engine=None, token=None, stats=None):
+    """
+    Counts the solutions of a grid like core.count_solutions, splitting the search over several
+    worker processes. The grid itself is not modified.
+
+    Args:
+    - grid: A Board or list of row lists (9x9, 16x16 or 25x25) with 0 for empty cells.
+    - limit: The number of solutions after which counting stops.
+    - workers: The number of worker processes. 1 searches in this process; None uses all cores.
+    - engine: The engine name, one of core.ENGINES (default: chosen by board size).
+    - token: Optional CancelToken used to cancel the search or give it a time budget.
+    - stats: Optional SolveStats that the merged counters of all workers are added to.
+
+    Returns:
+    - The number of solutions found, at most `limit`.
+
+    Raises:
+    - SolveCancelled: If the token is cancelled (SolveTimeout if it ran out of time).
+    """
+    found, _ = _search(board.cells_of(grid), limit, workers, engine, token, stats)
+    return found
+
+
+def _search(cells, limit, workers, engine, token, stats):
+    # Returns (found, solution), the solution as a flat list of values or None when nothing was found
+    workers = workers or os.cpu_count() or 1
+    engine = solver.engine_name(engine, cells)
+    consistent, candidates = solver.presolve_candidates(cells, stats)
+    if not consistent:
+        return 0, None
+
+    with solver.timed_phase(stats, "search"):
+        parts = [(cells, candidates, 0)]
+        if workers > 1:
+            parts, split_nodes = split(cells, candidates, workers * TASKS_PER_WORKER)
+            if stats is not None:
+                stats.nodes += split_nodes
+        if len(parts) > 1:
+            found, solution = _run_parts(parts, limit, workers, engine, token, stats)
+        elif parts:
+            # Nothing to share out: search the whole (remaining) puzzle here, counting into `stats`
+            # directly so the counters survive a cancelled search
+            part_cells, part_candidates, _ = parts[0]
+            work = board.Board(geometry.for_cells(len(cells)).box, part_cells)
+            found = solver.get_engine(engine).count_solutions(work, limit, token, part_candidates, stats)
+            solution = list(work.cells) if found else None
+        else:
+            found, solution = 0, None
+    return found, solution
+
+
+def split(cells, candidates, target, depth=0):
+    """
+    Expands the top of the search tree breadth-first into independent subproblems.
+
+    Every expanded node branches on the open cell with the fewest candidates (ignoring cells already
+    down to one), trying its digits in ascending order; a branch is dropped when fixing its digit
+    leaves a peer with no candidates. Expansion stops once there are at least `target` subproblems,
+    after MAX_SPLIT_DEPTH levels, or when no subproblem has a cell left to branch on.
+
+    Args:
+    - cells: A flat, row-major list of values (0 for empty).
+    - candidates: The matching candidate masks, as returned by logic.reduce_candidates().
+    - target: The number of subproblems wanted.
+    - depth: The search depth of `cells` itself, when splitting a subproblem again.
+
+    Returns:
+    - (parts, nodes): parts is a list of (cells, candidates, depth) subproblems in the order a
+      depth-first search would reach them, where depth counts the cells fixed by splits; nodes is the
+      number of split nodes expanded. An empty list means the puzzle has no solution.
+    """
+    shape = geometry.for_cells(len(cells))
+    parts = [(list(cells), list(candidates), depth)]
+    nodes = 0
+    for _ in range(MAX_SPLIT_DEPTH):
+        if len(parts) >= target:
+            break
+        expanded = []
+        grew = False
+        for part in parts:
+            children = _branch(part, shape)
+            if children is None:
+                expanded.append(part)
+            else:
+                nodes += 1
+                grew = True
+                expanded.extend(children)
+        parts = expanded
+        if not grew:
+            break
+    return parts, nodes
+
+
+def _branch(part, shape):
+    # The children of one subproblem, or None if it has no cell with two or more candidates
+    cells, masks, depth = part
+    bit_count = shape.bit_count
+    best, best_count = None, shape.size + 1
+    for cell, value in enumerate(cells):
+        if value == 0:
+            count = bit_count[masks[cell]]
+            if 1 < count < best_count:
+                best, best_count = cell, count
+                if count == 2:
+                    break
+    if best is None:
+        return None
+
+    children = []
+    remaining = masks[best]
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+        child_cells = list(cells)
+        child_cells[best] = shape.digit_of_bit[bit]
+        child_masks = list(masks)
+        child_masks[best] = bit
+        for peer in shape.peers[best]:
+            if child_masks[peer] & bit:
+                child_masks[peer] &= ~bit
+                if not child_masks[peer]:
+                    break
+        else:
+            children.append((child_cells, child_masks, depth + 1))
+    return children
+
+
+_Part = collections.namedtuple(
+    "_Part", "found solution nodes backtracks max_depth eliminations unfinished candidates"
+)
+
+
+def _search_part(cells, candidates, limit, engine, token):
+    # Presolves and searches one subproblem; a stopped or handed-back search still reports the nodes
+    # it expanded, and a handed-back one its presolved candidates, to split from
+    candidates, fired = logic.reduce_candidates(cells, candidates)
+    counters = SolveStats()
+    found, solution, unfinished = 0, None, False
+    if candidates is not None:
+        work = board.Board(geometry.for_cells(len(cells)).box, cells)
+        try:
+            found = solver.get_engine(engine).count_solutions(work, limit, token, candidates, counters)
+        except _HandBack:
+            unfinished = True
+            found = counters.solutions
+        except SolveCancelled:
+            if not isinstance(token, _WorkerToken):
+                raise
+        if found and not unfinished:
+            solution = list(work.cells)
+    return _Part(
+        found, solution, counters.nodes, counters.backtracks, counters.max_depth, fired, unfinished,
+        candidates if unfinished else None,
+    )
+
+
+def _merge(stats, part, depth):
+    if stats is None:
+        return
+    stats.nodes += part.nodes
+    stats.backtracks += part.backtracks
+    stats.max_depth = max(stats.max_depth, depth + part.max_depth)
+    stats.add_eliminations(part.eliminations)
+
+
+class _HandBack(SolveCancelled):
+    """Raised inside a worker's search to return its subproblem unfinished, to be split again."""
+
+
+class _WorkerToken(CancelToken):
+    """
+    A worker's token: cancelled once the pool's shared stop event is set, and, when `may_yield` is
+    set, handing the subproblem back once it has run YIELD_AFTER nodes and a worker is idle.
+    """
+
+    def __init__(self, may_yield):
+        super().__init__()
+        self.may_yield = may_yield
+        self.checks = 0
+
+    def check(self):
+        if _stop.is_set():
+            raise SolveCancelled("another worker finished the search")
+        self.checks += 1
+        if self.may_yield and self.checks * CHECK_INTERVAL >= YIELD_AFTER and _idle.value > 0:
+            with _idle.get_lock():
+                # Only one busy worker answers each idle one
+                if _idle.value > 0:
+                    _idle.value -= 1
+                    raise _HandBack()
+
+
+def _start_worker(stop, idle):
+    global _stop, _idle
+    _stop = stop
+    _idle = idle
+
+
+def _run_part(cells, candidates, limit, engine, may_yield):
+    # Top-level so it can be pickled and sent to worker processes; parts still queued when the
+    # search is stopped return None without starting
+    if _stop.is_set():
+        return None
+    return _search_part(cells, candidates, limit, engine, _WorkerToken(may_yield))
+
+
+def _run_parts(parts, limit, workers, engine, token, stats):
+    context = multiprocessing.get_context()
+    stop = context.Event()
+    idle = context.Value("i", 0)
+    found, solution = 0, None
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, mp_context=context, initializer=_start_worker, initargs=(stop, idle)
+    ) as pool:
+        tasks = {}  # Future -> the (cells, candidates, depth) subproblem it searches
+        for part in parts:
+            tasks[pool.submit(_run_part, part[0], part[1], limit, engine, True)] = part
+        pending = set(tasks)
+        try:
+            while pending and found < limit:
+                done, pending = concurrent.futures.wait(
+                    pending, POLL_INTERVAL, concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    cells, candidates, depth = tasks.pop(future)
+                    part = future.result()
+                    _merge(stats, part, depth)
+                    if part.unfinished:
+                        pending.update(_resubmit(pool, tasks, part, cells, depth, limit, workers, engine, stats))
+                        continue
+                    if part.found and solution is None:
+                        solution = part.solution
+                    found += part.found
+                if done:
+                    # With fewer subproblems than workers left, ask the busy ones to share theirs
+                    idle.value = max(0, workers - len(pending))
+                if token is not None:
+                    token.check()
+        finally:
+            # Stop the running searches and drop the queued ones, then collect what the running
+            # ones had counted when they stopped
+            stop.set()
+            for future in pending:
+                future.cancel()
+            for future in pending:
+                if not future.cancelled() and future.exception() is None and future.result() is not None:
+                    _merge(stats, future.result(), tasks[future][2])
+
+    found = min(found, limit)
+    if stats is not None:
+        stats.solutions += found
+    return found, solution
+
+
+def _resubmit(pool, tasks, part, cells, depth, limit, workers, engine, stats):
+    # Splits a handed-back subproblem and queues the pieces, returning their futures. One that had
+    # already found a solution, or cannot be split, is searched again whole and not handed back, so
+    # no solution is counted twice.
+    parts = [(cells, part.candidates, depth)]
+    if not part.found:
+        parts, split_nodes = split(cells, part.candidates, workers * TASKS_PER_WORKER, depth)
+        if stats is not None:
+            stats.nodes += split_nodes
+    may_yield = len(parts) > 1
+    futures = []
+    for child in parts:
+        future = pool.submit(_run_part, child[0], child[1], limit, engine, may_yield)
+        tasks[future] = child
+        futures.append(future)
+    return futures
@@ -0,0 +1,145 @@
+"""
+Common entry point for the solving engines.
+
+Every engine module exposes `solve(grid, token=None, candidates=None, stats=None)`, filling the grid in
+place and returning True when a solution exists, and a matching `count_solutions(grid, limit, ...)`.
+Engines are imported on first use. By default the candidates are first narrowed down by the logical
+techniques in `logic`, so easy puzzles need no search at all.
+"""
+
+import contextlib
+import importlib
+
+from sudoku.core import board, logic
+
+# Engine name -> module implementing it
+ENGINES = {
+    "backtrack": "sudoku.core.engine",
+    "dlx": "sudoku.core.dlx",
+}
+DEFAULT_ENGINE = "backtrack"
+LARGE_BOARD_ENGINE = "dlx"  # Picking the tightest constraint finds hidden singles, which pays off above 9x9
+
+
+def get_engine(name):
+    """
+    Returns the module implementing the named engine.
+
+    Raises:
+    - ValueError: If the name is not one of ENGINES.
+    """
+    if name not in ENGINES:
+        raise ValueError(f"unknown engine {name!r}, expected one of {', '.join(sorted(ENGINES))}")
+    return importlib.import_module(ENGINES[name])
+
+
+def solve(grid, engine=None, token=None, presolve=True, stats=None, candidates=None):
+    """
+    Solves a Sudoku grid in place with the chosen engine.
+
+    All engines return the same solution for the same 9x9 grid, so they can be swapped freely. A larger
+    grid with several solutions is filled with the first one the chosen engine reaches.
+
+    Args:
+    - grid: A Board or list of row lists (9x9, 16x16 or 25x25) with 0 for empty cells. It is filled in
+      when a solution exists.
+    - engine: The engine name, one of ENGINES. By default DEFAULT_ENGINE on 9x9 boards and
+      LARGE_BOARD_ENGINE on larger ones.
+    - token: Optional CancelToken used to cancel the search or give it a time budget.
+    - presolve: If True, run the logical reduction first and search only what it leaves open.
+    - stats: Optional SolveStats that counters, phase timings and eliminations are added to.
+    - candidates: Optional starting candidate masks with the givens' digits already removed from
+      their peers (see ConflictIndex.candidate_masks()), so the constraint state is not rebuilt.
+
+    Returns:
+    - True if the puzzle is successfully solved, False otherwise.
+
+    Raises:
+    - SolveCancelled: If the token is cancelled (SolveTimeout if it ran out of time).
+    """
+    cells = board.cells_of(grid)
+    consistent, candidates = _presolve(cells, presolve, stats, candidates)
+    if not consistent:
+        return False
+    with timed_phase(stats, "search"):
+        return get_engine(engine_name(engine, cells)).solve(grid, token, candidates, stats)
+
+
+def count_solutions(grid, limit=2, engine=None, token=None, presolve=True, stats=None, candidates=None,
+                    fill=False):
+    """
+    Counts the solutions of a grid, stopping as soon as `limit` have been found.
+
+    With the default limit of 2 this is a uniqueness check: 0 means no solution, 1 a valid puzzle and
+    2 more than one solution. The grid itself is not modified unless `fill` is set.
+
+    Args:
+    - grid: A Board or list of row lists (9x9, 16x16 or 25x25) with 0 for empty cells.
+    - limit: The number of solutions after which counting stops.
+    - engine: The engine name, one of ENGINES. By default DEFAULT_ENGINE on 9x9 boards and
+      LARGE_BOARD_ENGINE on larger ones.
+    - token: Optional CancelToken used to cancel the search or give it a time budget.
+    - presolve: If True, run the logical reduction first and search only what it leaves open.
+    - stats: Optional SolveStats that counters, phase timings and eliminations are added to.
+    - candidates: Optional starting candidate masks with the givens' digits already removed from
+      their peers (see ConflictIndex.candidate_masks()), so the constraint state is not rebuilt.
+    - fill: If True, fill the grid in with the first solution the search reached, so a uniqueness
+      check that finds exactly one solution needs no second search to show it.
+
+    Returns:
+    - The number of solutions found, at most `limit`.
+
+    Raises:
+    - SolveCancelled: If the token is cancelled (SolveTimeout if it ran out of time).
+    """
+    cells = board.cells_of(grid)
+    consistent, candidates = _presolve(cells, presolve, stats, candidates)
+    if not consistent:
+        return 0
+    with timed_phase(stats, "search"):
+        search_engine = get_engine(engine_name(engine, cells))
+        target = grid if fill else board.copy_of(grid)
+        return search_engine.count_solutions(target, limit, token, candidates, stats)
+
+
+def engine_name(engine, cells):
+    # An explicit choice wins; otherwise use the engine that suits the board size
+    if engine is not None:
+        return engine
+    return DEFAULT_ENGINE if len(cells) <= 81 else LARGE_BOARD_ENGINE
+
+
+def presolve_candidates(cells, stats=None, candidates=None):
+    """
+    Runs the logical reduction that solve() and count_solutions() start with.
+
+    Args:
+    - cells: A flat, row-major list of values (0 for empty).
+    - stats: Optional SolveStats; the reduction is timed as its "presolve" phase and its
+      eliminations are added.
+    - candidates: Optional starting candidate masks, as for solve().
+
+    Returns:
+    - (consistent, candidates): consistent is False if the grid was found to have no solution;
+      otherwise candidates are the reduced per-cell masks.
+    """
+    with timed_phase(stats, "presolve"):
+        candidates, fired = logic.reduce_candidates(cells, candidates)
+    if stats is not None:
+        stats.add_eliminations(fired)
+    return candidates is not None, candidates
+
+
+def _presolve(cells, presolve, stats, candidates=None):
+    # With the presolve switched off the given candidates (if any) are passed through unchanged
+    if not presolve:
+        return True, candidates
+    return presolve_candidates(cells, stats, candidates)
+
+
+def timed_phase(stats, name):
+    """
+    Returns a context manager timing the enclosed block as the named phase of `stats`, or doing
+    nothing when stats is None.
+    """
+    return stats.phase(name) if stats is not None else contextlib.nullcontext()
@@ -0,0 +1,113 @@
+"""
+Search statistics and observer hooks, collected only when requested.
+
+Pass a SolveStats as the `stats` argument of core.solve or core.count_solutions to have the counters
+filled in. Without one, the engines skip all bookkeeping beyond their own plain integer counters.
+"""
+
+import collections
+import contextlib
+import time
+
+
+class SolveObserver(object):
+    """
+    Base class for live instrumentation; every hook is a no-op, so override only what you need.
+
+    Attach an observer by passing it to SolveStats.
+    """
+
+    def on_phase_start(self, phase):
+        """Called when a phase ("presolve" or "search") begins."""
+
+    def on_phase_end(self, phase, seconds):
+        """Called when a phase ends, with its wall-clock duration."""
+
+    def on_eliminations(self, technique, count):
+        """Called after the presolve for every logical technique that made deductions."""
+
+    def on_progress(self, nodes, depth):
+        """Called from inside the search every CHECK_INTERVAL nodes with the node count and depth."""
+
+
+class SolveStats(object):
+    """
+    Counters filled in by a solve or count when passed as its `stats` argument.
+
+    One instance may be passed to several calls; the counters accumulate.
+
+    Attributes:
+    - nodes: Search nodes expanded (calls into the engine's recursive search).
+    - backtracks: Placements the search had to undo.
+    - max_depth: The deepest level the search reached.
+    - solutions: Solutions the searches found.
+    - eliminations: Counter of logical technique -> deductions made by the presolve.
+    - phase_seconds: Wall-clock seconds spent per phase ("presolve", "search").
+    - observer: Optional SolveObserver receiving live callbacks.
+    """
+
+    def __init__(self, observer=None):
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.solutions = 0
+        self.eliminations = collections.Counter()
+        self.phase_seconds = collections.defaultdict(float)
+        self.observer = observer
+
+    def add_search(self, search, solutions=True):
+        # Merge the counters of a finished (or cancelled) engine search object; solutions=False
+        # leaves out the solutions of searches that only probe whether a partial grid is solvable
+        self.nodes += search.nodes
+        self.backtracks += search.backtracks
+        self.max_depth = max(self.max_depth, search.max_depth)
+        if solutions:
+            self.solutions += search.count
+
+    def add_eliminations(self, fired):
+        # Merge the per-technique Counter returned by logic.reduce_candidates
+        self.eliminations.update(fired)
+        if self.observer is not None:
+            for technique, count in sorted(fired.items()):
+                self.observer.on_eliminations(technique, count)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Times the enclosed block as the named phase, notifying the observer at both ends.
+        """
+        if self.observer is not None:
+            self.observer.on_phase_start(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self.phase_seconds[name] += seconds
+            if self.observer is not None:
+                self.observer.on_phase_end(name, seconds)
+
+    def as_dict(self):
+        """
+        Returns the counters as a JSON-serialisable dict, with phase times in milliseconds.
+        """
+        return {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "solutions": self.solutions,
+            "eliminations": dict(sorted(self.eliminations.items())),
+            "phase_ms": {
+                name: round(seconds * 1000, 3) for name, seconds in sorted(self.phase_seconds.items())
+            },
+        }
+
+    def summary(self):
+        """
+        Returns a one-line, human-readable summary, e.g. for a status bar.
+        """
+        total_ms = sum(self.phase_seconds.values()) * 1000
+        text = f"{total_ms:.1f} ms, {self.nodes} nodes, {self.backtracks} backtracks, depth {self.max_depth}"
+        if self.eliminations:
+            text += f", {sum(self.eliminations.values())} logical deductions"
+        return text
@@ -0,0 +1,36 @@
+"""
+Duplicate detection for partially filled grids.
+"""
+
+from sudoku.core import board, geometry
+
+
+def find_duplicates(grid):
+    """
+    Checks the grid for duplicate values in rows, columns, or subgrids.
+
+    Rows are checked first, then columns, then subgrids; the first conflict found is reported.
+
+    Args:
+    - grid: A Board, or a list of row lists with 0 for empty cells, of any supported size.
+
+    Returns:
+    - None if no duplicates are found, otherwise a (unit, index) tuple where unit is "row", "column"
+      or "box" and index counts from 0. Boxes are numbered row-major, so on a 9x9 board box 5 is the
+      middle-right subgrid.
+    """
+    cells = board.cells_of(grid)
+    shape = geometry.for_cells(len(cells))
+
+    for unit, lines in (("row", shape.rows), ("column", shape.columns), ("box", shape.boxes)):
+        for index, line in enumerate(lines):
+            seen = 0
+            for cell in line:
+                value = cells[cell]
+                if value != 0:
+                    bit = 1 << value
+                    if seen & bit:
+                        return (unit, index)
+                    seen |= bit
+
+    return None
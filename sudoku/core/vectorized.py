@@ -0,0 +1,262 @@
+"""
+Vectorised candidate propagation over many puzzles at once (requires NumPy).
+
+A batch of boards is loaded into one candidate array of shape (batch, cells), holding the same
+bitmask per cell that the engines use (bit d set means digit d + 1 is still possible). Naked and
+hidden singles, naked and hidden pairs and pointing/claiming are then applied to the whole batch
+with array reductions over the unit index tables, until nothing changes. Most easy and medium
+puzzles are solved outright; only the ones left open go through the normal per-puzzle presolve and
+search.
+
+Every deduction holds in every solution, so a puzzle solved here has exactly one solution and the
+answer is the same one core.solve returns.
+"""
+
+import functools
+
+from sudoku.core import board, geometry, solver
+
+try:
+    import numpy
+except ImportError:  # Optional dependency: only this module needs it
+    numpy = None
+
+SOLVED = 1
+OPEN = 0
+CONTRADICTION = -1
+
+
+def available():
+    """
+    Returns True if NumPy is installed and solve_many can be used.
+    """
+    return numpy is not None
+
+
+class _Tables(object):
+    """The geometry tables of one box size as NumPy index arrays."""
+
+    def __init__(self, box):
+        shape = geometry.geometry(box)
+        self.size = shape.size
+        self.dtype = numpy.uint16 if shape.size <= 16 else numpy.uint32
+        self.all_digits = self.dtype(shape.all_digits)
+        # Candidate counts by mask; 25x25 masks are counted 16 bits at a time through the 16x16 table
+        table = shape if shape.size <= 16 else geometry.geometry(4)
+        self.bit_count = numpy.array(table.bit_count, dtype=numpy.uint8)
+        self.split = shape.size > 16
+
+        # Units as (units, size) cell indices, and the three (unit, position) pairs of every cell
+        self.units = numpy.array(shape.units, dtype=numpy.intp)
+        unit_of = [[] for _ in range(shape.cell_count)]
+        position_of = [[] for _ in range(shape.cell_count)]
+        for unit, cells in enumerate(shape.units):
+            for position, cell in enumerate(cells):
+                unit_of[cell].append(unit)
+                position_of[cell].append(position)
+        self.unit_of = numpy.array(unit_of, dtype=numpy.intp)
+        self.position_of = numpy.array(position_of, dtype=numpy.intp)
+
+        # Box/line intersections, and for every cell the intersections whose rest of line or rest of
+        # box it belongs to (the same number for every cell)
+        self.shared = numpy.array([shared for shared, _, _ in shape.intersections], dtype=numpy.intp)
+        self.rest_of_line = numpy.array([line for _, line, _ in shape.intersections], dtype=numpy.intp)
+        self.rest_of_box = numpy.array([rest for _, _, rest in shape.intersections], dtype=numpy.intp)
+        line_of = [[] for _ in range(shape.cell_count)]
+        box_of = [[] for _ in range(shape.cell_count)]
+        for k, (_, line, rest) in enumerate(shape.intersections):
+            for cell in line:
+                line_of[cell].append(k)
+            for cell in rest:
+                box_of[cell].append(k)
+        self.line_of = numpy.array(line_of, dtype=numpy.intp)
+        self.box_of = numpy.array(box_of, dtype=numpy.intp)
+
+    def count(self, masks):
+        # Number of candidates in every mask
+        if self.split:
+            return self.bit_count[masks & 0xFFFF] + self.bit_count[masks >> 16]
+        return self.bit_count[masks]
+
+
+@functools.lru_cache(maxsize=None)
+def _tables(box):
+    return _Tables(box)
+
+
+def _or(masks, index):
+    # OR of the masks at each row of an index array: (batch, cells) x (k, m) -> (batch, k)
+    return numpy.bitwise_or.reduce(masks[:, index], axis=2)
+
+
+def _once_twice(in_units):
+    # Digits seen at least once and at least twice across the last axis of (batch, units, size)
+    once = numpy.zeros(in_units.shape[:2], dtype=in_units.dtype)
+    twice = numpy.zeros_like(once)
+    for position in range(in_units.shape[2]):
+        masks = in_units[:, :, position]
+        twice |= once & masks
+        once |= masks
+    return once, twice
+
+
+def _naked_pairs(in_units, tables):
+    # Digits to remove at every (batch, unit, position): two cells of a unit with the same two
+    # candidates take both digits away from the other cells of that unit
+    counts = tables.count(in_units)
+    removed = numpy.zeros_like(in_units)
+    for position in range(in_units.shape[2]):
+        masks = in_units[:, :, position:position + 1]
+        same = in_units == masks
+        pair = (counts[:, :, position:position + 1] == 2) & (same.sum(axis=2, keepdims=True) == 2)
+        removed |= numpy.where(pair & ~same, masks, 0)
+    return removed
+
+
+def _hidden_pairs(in_units, tables):
+    # Digits to keep at every (batch, unit, position): two digits confined to the same two cells of
+    # a unit rule out every other digit in those cells
+    size = in_units.shape[2]
+    bits = numpy.left_shift(1, numpy.arange(size)).astype(in_units.dtype)
+
+    # Transpose to the positions (as a bitmask) where each digit can still go
+    places = numpy.zeros_like(in_units)
+    for position in range(size):
+        places |= ((in_units[:, :, position:position + 1] & bits) != 0) * bits[position]
+
+    counts = tables.count(places)
+    kept = numpy.full_like(in_units, tables.all_digits)
+    for digit in range(size):
+        where = places[:, :, digit:digit + 1]
+        same = places == where
+        pair = (counts[:, :, digit:digit + 1] == 2) & (same.sum(axis=2, keepdims=True) == 2)
+        digits = numpy.bitwise_or.reduce(numpy.where(same, bits, 0), axis=2, keepdims=True)
+        kept &= numpy.where(pair & ((where & bits) != 0), digits, tables.all_digits)
+    return kept
+
+
+def _pairs_and_intersections(masks, tables):
+    # Naked pairs, hidden pairs and pointing/claiming on a (batch, cells) array of boards
+    in_units = masks[:, tables.units]
+    removed = _naked_pairs(in_units, tables)[:, tables.unit_of, tables.position_of]
+    kept = _hidden_pairs(in_units, tables)[:, tables.unit_of, tables.position_of]
+    masks = masks & ~numpy.bitwise_or.reduce(removed, axis=2) & numpy.bitwise_and.reduce(kept, axis=2)
+
+    # Digits confined to a box/line intersection on one side are removed from the other side
+    shared = _or(masks, tables.shared)
+    pointing = shared & ~_or(masks, tables.rest_of_box)
+    claiming = shared & ~_or(masks, tables.rest_of_line)
+    return masks & ~(_or(pointing, tables.line_of) | _or(claiming, tables.box_of))
+
+
+def candidate_masks(cell_lists, box=3):
+    """
+    Builds the (batch, cells) candidate mask array for a list of boards.
+
+    Args:
+    - cell_lists: Flat, row-major cell lists (0 for empty), all for the same box size.
+    - box: The box size of the boards.
+    """
+    tables = _tables(box)
+    values = numpy.array(cell_lists, dtype=numpy.int64).reshape(len(cell_lists), tables.size ** 2)
+    given = numpy.left_shift(1, numpy.maximum(values - 1, 0))
+    return numpy.where(values == 0, int(tables.all_digits), given).astype(tables.dtype)
+
+
+def propagate(masks, box=3):
+    """
+    Applies naked and hidden singles, then (where those stall) naked and hidden pairs and
+    pointing/claiming, to every board until nothing changes.
+
+    Args:
+    - masks: A (batch, cells) candidate mask array, e.g. from candidate_masks().
+    - box: The box size of the boards.
+
+    Returns:
+    - (masks, status): the reduced masks and a (batch,) array holding SOLVED, OPEN or CONTRADICTION
+      for each board.
+    """
+    tables = _tables(box)
+    result = masks.copy()
+    status = numpy.full(len(result), OPEN, dtype=numpy.int8)
+
+    # Boards still being worked on; finished ones drop out so later rounds get cheaper
+    active = numpy.arange(len(result))
+    work = result
+    while len(active):
+        # Naked singles: a fixed digit goes from every other cell of its units. The same digit
+        # fixed twice in one unit means the board has no solution.
+        fixed = tables.count(work) == 1
+        once, twice = _once_twice(numpy.where(fixed, work, 0)[:, tables.units])
+        dead = (twice != 0).any(axis=1)
+        reduced = numpy.where(fixed, work, work & ~_or(once, tables.unit_of))
+
+        # Hidden singles: a digit with exactly one place left in a unit must go there
+        once, twice = _once_twice(reduced[:, tables.units])
+        dead |= (once != tables.all_digits).any(axis=1)
+        forced = reduced & _or(once & ~twice, tables.unit_of)
+        forced_count = tables.count(forced)
+        dead |= (forced_count > 1).any(axis=1)
+        reduced = numpy.where(forced_count == 1, forced, reduced)
+
+        # The costlier techniques only run on open boards where the singles made no progress
+        progress = (reduced != work).any(axis=1)
+        stuck = numpy.flatnonzero(~dead & ~progress & ~(tables.count(reduced) == 1).all(axis=1))
+        if len(stuck):
+            reduced[stuck] = _pairs_and_intersections(reduced[stuck], tables)
+
+        counts = tables.count(reduced)
+        dead |= (counts == 0).any(axis=1)
+        changed = (reduced != work).any(axis=1)
+        solved = ~dead & ~changed & (counts == 1).all(axis=1)
+
+        # Boards that stalled short of a solution keep the OPEN status they started with
+        result[active] = reduced
+        status[active[dead]] = CONTRADICTION
+        status[active[solved]] = SOLVED
+        keep = changed & ~dead
+        active, work = active[keep], reduced[keep]
+
+    return result, status
+
+
+def solve_many(grids, engine=None, presolve=True):
+    """
+    Solves many boards in place, propagating candidates across the whole batch at once.
+
+    Boards the propagation cannot finish are solved one by one with core.solve, so the results are
+    identical to calling core.solve on each board.
+
+    Args:
+    - grids: A list of Boards or lists of row lists, of any mix of supported sizes.
+    - engine: The engine for the boards that still need a search (see core.solve).
+    - presolve: Passed on to core.solve for those boards.
+
+    Returns:
+    - A list with True for every board that was solved and False for every board with no solution.
+
+    Raises:
+    - ImportError: If NumPy is not installed.
+    """
+    if numpy is None:
+        raise ImportError("solve_many requires NumPy (pip install numpy)")
+
+    results = [False] * len(grids)
+    groups = {}
+    for index, grid in enumerate(grids):
+        cells = board.cells_of(grid)
+        groups.setdefault(geometry.for_cells(len(cells)).box, []).append((index, cells))
+
+    for box, members in groups.items():
+        masks, status = propagate(candidate_masks([cells for _, cells in members], box), box)
+        solved = numpy.flatnonzero(status == SOLVED)
+        values = _tables(box).count(masks[solved] - 1) + 1  # A single-bit mask 1 << d has d bits below it
+        values = dict(zip(solved.tolist(), values.tolist()))
+        for k, (index, _) in enumerate(members):
+            grid = grids[index]
+            if status[k] == SOLVED:
+                board.assign(grid, values[k])
+                results[index] = True
+            elif status[k] == OPEN:
+                results[index] = solver.solve(grid, engine, presolve=presolve)
+    return results
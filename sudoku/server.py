@@ -0,0 +1,390 @@
+"""
+Local HTTP/JSON solving service.
+
+Usage:
+    python -m sudoku serve --port 8000 --workers 4
+    curl -d '{"puzzle": "530070000600195000..."}' http://127.0.0.1:8000/solve
+    curl -d '{"puzzles": ["...", "..."], "timeout": 5}' http://127.0.0.1:8000/solve
+    curl http://127.0.0.1:8000/health
+    curl http://127.0.0.1:8000/metrics
+
+Every puzzle of every request goes onto one bounded queue. A dispatcher task drains the queue into
+micro-batches (up to --batch-size puzzles, waiting at most --batch-wait for more once the first has
+arrived) and hands each batch to a process pool that is started, and warmed up, with the server.
+Workers run batch.solve_chunk, so puzzles are validated and solved exactly as the CLI and the window
+do it, including the per-worker solution cache. When the queue cannot take a whole request the
+server answers 503 straight away instead of letting the backlog grow.
+
+Responses hold one result per puzzle: {"status": "solved", "solution": "..."}, or a status of
+"unsolvable", "invalid" or "timeout" without a solution. A request for a single "puzzle" gets that
+object back; a request for "puzzles" gets {"results": [...]} in the same order.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import http
+import json
+import os
+import sys
+import time
+
+from sudoku import batch
+
+MAX_BODY = 4 * 1024 * 1024  # Largest request body accepted, in bytes
+MAX_HEADERS = 100
+
+
+class Overloaded(Exception):
+    """Raised by SolveService.solve when the queue has no room for the request."""
+
+
+class _HttpError(Exception):
+    """An error answered with the given HTTP status and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _warm_up():
+    # Runs once in every worker so the first real batch does not pay for the imports
+    from sudoku.core import dlx, engine, logic  # noqa: F401
+
+    return os.getpid()
+
+
+class SolveService(object):
+    """
+    Micro-batching front end to a warm process pool.
+
+    Args:
+    - workers: Worker processes (default: all cores).
+    - batch_size: The most puzzles sent to a worker at once.
+    - batch_wait: Seconds to wait for more puzzles once a batch has been started.
+    - queue_size: The most puzzles waiting for a worker; requests beyond that are refused.
+    - timeout: Default and maximum seconds a request may take, and each puzzle's search budget.
+    - cache_size: Solutions each worker caches by symmetry class; 0 disables the cache.
+    - engine: The solving engine name, one of core.ENGINES (default: chosen by board size).
+
+    Raises:
+    - ValueError: If cache_size is negative, which would otherwise fail every batch in the workers.
+    """
+
+    def __init__(self, workers=None, batch_size=64, batch_wait=0.002, queue_size=10000, timeout=10.0,
+                 cache_size=1000, engine=None):
+        if cache_size < 0:
+            raise ValueError(f"cache_size must be at least 0, got {cache_size}")
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.timeout = timeout
+        self.solve_chunk = functools.partial(
+            batch.solve_chunk, engine=engine, cache_size=cache_size, timeout=timeout
+        )
+        self.queue = asyncio.Queue(queue_size)
+        self.pool = None
+        self.dispatcher = None
+        self.running = set()
+
+        # At most two batches per worker are in flight; the rest wait in the queue
+        self.slots = asyncio.Semaphore(2 * self.workers)
+
+        self.started = time.monotonic()
+        self.counters = collections.Counter()
+        self.solve_seconds = 0.0
+        self.max_latency = 0.0
+
+    async def start(self):
+        """
+        Starts the worker processes, waits until every one of them is ready, and starts dispatching.
+        """
+        loop = asyncio.get_running_loop()
+        self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_up) for _ in range(self.workers)))
+        self.dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self):
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+            await asyncio.gather(self.dispatcher, return_exceptions=True)
+        await asyncio.gather(*self.running, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def solve(self, lines, timeout=None):
+        """
+        Solves puzzle lines on the pool.
+
+        Args:
+        - lines: Puzzles in the text format (see core.parse_grid).
+        - timeout: Seconds to wait for the answers, capped at the service timeout. Puzzles still
+          queued or running by then are reported as batch.TIMEOUT.
+
+        Returns:
+        - One result per line, as batch.solve_line gives them.
+
+        Raises:
+        - Overloaded: If the queue cannot take every line of the request.
+        """
+        if self.queue.maxsize and self.queue.maxsize - self.queue.qsize() < len(lines):
+            self.counters["rejected"] += 1
+            raise Overloaded(f"queue full ({self.queue.qsize()} puzzles waiting)")
+
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for line in lines:
+            future = loop.create_future()
+            self.queue.put_nowait((line, future))
+            futures.append(future)
+
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        if futures:
+            await asyncio.wait(futures, timeout=timeout)
+
+        results = []
+        for future in futures:
+            if future.done():
+                results.append(future.result())
+            else:
+                future.cancel()  # The dispatcher drops it if it is still queued
+                results.append(batch.TIMEOUT)
+
+        latency = time.monotonic() - started
+        self.max_latency = max(self.max_latency, latency)
+        self.counters["requests"] += 1
+        self.counters["puzzles"] += len(lines)
+        self.counters.update(_status(result) for result in results)
+        return results
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            deadline = loop.time() + self.batch_wait
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self.slots.acquire()
+
+            # Requests that timed out while their puzzles were queued no longer want them
+            items = [item for item in items if not item[1].done()]
+            if not items:
+                self.slots.release()
+                continue
+            task = asyncio.create_task(self._run_batch(items))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _run_batch(self, items):
+        loop = asyncio.get_running_loop()
+        try:
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.pool, self.solve_chunk, [line for line, _ in items])
+            except Exception as error:  # E.g. a worker died; fail the batch, not the server
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+            self.solve_seconds += time.perf_counter() - started
+            self.counters["batches"] += 1
+            self.counters["batched_puzzles"] += len(items)
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.slots.release()
+
+    def health(self):
+        return {"status": "ok", "workers": self.workers, "queued": self.queue.qsize()}
+
+    def metrics(self):
+        """
+        Returns the counters since startup, plus the current queue depth and batches in flight.
+        """
+        counters = self.counters
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "requests": counters["requests"],
+            "rejected": counters["rejected"],
+            "puzzles": counters["puzzles"],
+            "results": {status: counters[status] for status in _STATUSES},
+            "batches": counters["batches"],
+            "mean_batch_size": round(counters["batched_puzzles"] / counters["batches"], 2)
+            if counters["batches"] else 0.0,
+            "solve_seconds": round(self.solve_seconds, 3),
+            "max_request_seconds": round(self.max_latency, 3),
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "batches_in_flight": len(self.running),
+            "workers": self.workers,
+        }
+
+    async def handle(self, reader, writer):
+        """
+        Serves one connection, keeping it open between requests unless the client asks otherwise.
+        """
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    status, payload = await self._route(method, path, body)
+                except _HttpError as error:
+                    await _write_response(writer, error.status, {"error": str(error)}, keep_alive=False)
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await _write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        path = path.split("?", 1)[0]
+        routes = {"/solve": "POST", "/health": "GET", "/metrics": "GET"}
+        if path not in routes:
+            raise _HttpError(http.HTTPStatus.NOT_FOUND, f"no such endpoint {path}")
+        if method != routes[path]:
+            raise _HttpError(http.HTTPStatus.METHOD_NOT_ALLOWED, f"{path} only accepts {routes[path]}")
+
+        if path == "/health":
+            return http.HTTPStatus.OK, self.health()
+        if path == "/metrics":
+            return http.HTTPStatus.OK, self.metrics()
+
+        lines, single, timeout = _parse_solve_request(body)
+        try:
+            results = await self.solve(lines, timeout)
+        except Overloaded as error:
+            return http.HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(error)}
+        except Exception as error:
+            return http.HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"solver failed: {error}"}
+        payloads = [_result_payload(result) for result in results]
+        return http.HTTPStatus.OK, payloads[0] if single else {"results": payloads}
+
+
+_STATUSES = ("solved", batch.UNSOLVABLE, batch.INVALID, batch.TIMEOUT)
+
+
+def _status(result):
+    return result if result in _STATUSES else "solved"
+
+
+def _result_payload(result):
+    status = _status(result)
+    return {"status": status, "solution": result} if status == "solved" else {"status": status}
+
+
+def _parse_solve_request(body):
+    # Returns (lines, single, timeout) from a /solve body
+    try:
+        request = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise _HttpError(http.HTTPStatus.BAD_REQUEST, f"body is not valid JSON: {error}")
+    if not isinstance(request, dict):
+        raise _HttpError(http.HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+
+    if "puzzle" in request:
+        lines, single = [request["puzzle"]], True
+    elif "puzzles" in request:
+        lines, single = request["puzzles"], False
+        if not isinstance(lines, list):
+            raise _HttpError(http.HTTPStatus.BAD_REQUEST, '"puzzles" must be a list')
+    else:
+        raise _HttpError(http.HTTPStatus.BAD_REQUEST, 'expected a "puzzle" or "puzzles" field')
+    if not all(isinstance(line, str) for line in lines):
+        raise _HttpError(http.HTTPStatus.BAD_REQUEST, "puzzles must be strings")
+
+    timeout = request.get("timeout")
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise _HttpError(http.HTTPStatus.BAD_REQUEST, '"timeout" must be a positive number of seconds')
+    return [line.strip() for line in lines], single, timeout
+
+
+async def _read_request(reader):
+    # Returns (method, path, headers, body), or None when the client closed the connection
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise _HttpError(http.HTTPStatus.BAD_REQUEST, "malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise _HttpError(http.HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "too many headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise _HttpError(http.HTTPStatus.BAD_REQUEST, "bad Content-Length")
+    if length > MAX_BODY:
+        raise _HttpError(http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body larger than {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method.upper(), path, headers, body
+
+
+async def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, separators=(",", ":")).encode() + b"\n"
+    head = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        "Connection: " + ("keep-alive" if keep_alive else "close"),
+    ]
+    if status == http.HTTPStatus.SERVICE_UNAVAILABLE:
+        head.append("Retry-After: 1")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+async def _serve(host, port, service):
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"serving on http://{address[0]}:{address[1]} with {service.workers} worker(s)", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def serve(host="127.0.0.1", port=8000, **options):
+    """
+    Runs the service until interrupted.
+
+    Args:
+    - host, port: The address to listen on; only localhost by default.
+    - options: Passed on to SolveService.
+    """
+    try:
+        asyncio.run(_serve(host, port, SolveService(**options)))
+    except KeyboardInterrupt:
+        pass